@@ -24,6 +24,10 @@ def create_app():
         import os
         os.environ['FLASK_TESTING'] = '1'
 
+    # Discogs client class used by the routes, looked up per request so it can be swapped per app
+    from services.discogs_api_client import DiscogsCollectionClient
+    app.extensions['discogs_client_cls'] = DiscogsCollectionClient
+
     # Register blueprints
     from app import routes
 
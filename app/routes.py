@@ -4,7 +4,7 @@ Flask route handlers for Discogs Collection to QR Factory CSV Generator
 
 from flask import (
     Blueprint, render_template, request, redirect, url_for,
-    session, flash, current_app, send_file
+    session, flash, current_app, Response, stream_with_context, jsonify
 )
 import os
 import csv
@@ -13,7 +13,6 @@ from datetime import datetime
 from dotenv import load_dotenv, set_key, get_key
 
 # Import local modules
-from services.discogs_api_client import DiscogsCollectionClient
 from services.discogs_collection_processor import DiscogsCollectionProcessor
 
 USERAGENT = os.getenv("USERAGENT", "pyqrfactorydiscogs/1.0")
@@ -30,6 +29,48 @@ def is_test_environment() -> bool:
 
 bp = Blueprint('main', __name__)
 
+def iter_csv_lines(header: list, rows):
+    """
+    Yield a CSV document one line at a time.
+
+    Args:
+        header (list): Column names written as the first line
+        rows (iterable): Row value lists, consumed lazily
+
+    Returns:
+        Iterator[str]: The CSV-encoded header line followed by one line per row
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    yield buffer.getvalue()
+
+    for row in rows:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(row)
+        yield buffer.getvalue()
+
+def csv_download_response(lines) -> Response:
+    """
+    Build a streamed CSV attachment response.
+
+    Args:
+        lines (iterable): CSV lines as produced by iter_csv_lines
+
+    Returns:
+        Response: Streamed text/csv response with a timestamped attachment filename
+    """
+    # Create filename with timestamp
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = f'discogs_collection_{timestamp}.csv'
+
+    return Response(
+        stream_with_context(lines),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
 @bp.route('/')
 def landing():
     """Landing page with selection options"""
@@ -48,7 +89,7 @@ def landing():
             ('oauth_token' not in session or 'oauth_secret' not in session)):
             try:
                 # Initialize client with credentials from .env
-                client = DiscogsCollectionClient(
+                client = current_app.extensions['discogs_client_cls'](
                     consumer_key=consumer_key,
                     consumer_secret=consumer_secret,
                     useragent=USERAGENT,
@@ -118,7 +159,7 @@ def authenticate():
 
     try:
         # Initialize client with credentials from form
-        client = DiscogsCollectionClient(
+        client = current_app.extensions['discogs_client_cls'](
             consumer_key=consumer_key,
             consumer_secret=consumer_secret,
             useragent=USERAGENT
@@ -212,7 +253,7 @@ def oauth_callback():
             return render_template('oauth_callback.html', success=False, error_message=error_message)
 
         # Initialize client with consumer credentials
-        client = DiscogsCollectionClient(
+        client = current_app.extensions['discogs_client_cls'](
             consumer_key=consumer_key,
             consumer_secret=consumer_secret,
             useragent=USERAGENT,
@@ -266,7 +307,7 @@ def folders():
 
     try:
         # Initialize client with credentials and tokens from session
-        client = DiscogsCollectionClient(
+        client = current_app.extensions['discogs_client_cls'](
             consumer_key=session.get('consumer_key', ''),
             consumer_secret=session.get('consumer_secret', ''),
             useragent=USERAGENT,
@@ -281,6 +322,9 @@ def folders():
         # Get collection folders
         folders_list = client.get_collection_folders()
 
+        # Return the folders as JSON when requested, skipping template rendering
+        if request.args.get('format') == 'json':
+            return jsonify(folders=[{'id': f.id, 'name': f.name} for f in folders_list or []])
 
         if not folders_list:
             flash('No folders found in your collection', 'info')
@@ -315,7 +359,7 @@ def releases(folder_id):
 
     try:
         # Initialize client with credentials and tokens from session
-        client = DiscogsCollectionClient(
+        client = current_app.extensions['discogs_client_cls'](
             consumer_key=session.get('consumer_key', ''),
             consumer_secret=session.get('consumer_secret', ''),
             useragent=USERAGENT,
@@ -332,6 +376,9 @@ def releases(folder_id):
 
 
         if not releases_dict:
+            # An empty folder is an empty list in JSON, like an empty collection on /folders
+            if request.args.get('format') == 'json':
+                return jsonify(folder_id=folder_id, releases=[])
             flash('No releases found in this folder', 'info')
             return redirect(url_for('main.folders'))
 
@@ -389,6 +436,10 @@ def releases(folder_id):
                 reverse=True
             )
 
+        # Return the sorted releases as JSON when requested, skipping template rendering
+        if request.args.get('format') == 'json':
+            return jsonify(folder_id=folder_id, releases=sorted_releases)
+
         # Get the actual folder name
         folder_name = client.get_folder_name_by_id(folder_id)
 
@@ -425,7 +476,7 @@ def preview_csv():
             flash('No releases selected', 'error')
             return redirect(request.referrer or url_for('main.folders'))
 
-        client = DiscogsCollectionClient(
+        client = current_app.extensions['discogs_client_cls'](
             consumer_key=session.get('consumer_key', ''),
             consumer_secret=session.get('consumer_secret', ''),
             useragent=USERAGENT,
@@ -440,18 +491,22 @@ def preview_csv():
         # This is more efficient than getting all folders and filtering
         releases_data = []
         counter = 0
-        for release_id in selected_ids:
-            try:
-               # Convert to int explicitly as get_release_by_releaseid expects int
-                release_id_int = int(str(release_id))
-                release = client.get_release_by_releaseid(release_id_int)
-                if release:
-                    releases_data.append(release)
-                counter = counter + 1
-                current_app.logger.info(f"Processing release {counter} of selected id's")
-            except Exception as e:
-                current_app.logger.warning(f"Error fetching release {release_id}: {str(e)}")
-                continue
+        try:
+            for release_id in selected_ids:
+                try:
+                   # Convert to int explicitly as get_release_by_releaseid expects int
+                    release_id_int = int(str(release_id))
+                    release = client.get_release_by_releaseid(release_id_int)
+                    if release:
+                        releases_data.append(release)
+                    counter = counter + 1
+                    current_app.logger.info(f"Processing release {counter} of selected id's")
+                except Exception as e:
+                    current_app.logger.warning(f"Error fetching release {release_id}: {str(e)}")
+                    continue
+        finally:
+            # Close the release cache so concurrent requests don't each leave a shelf open on the same file
+            client.close()
 
         # Convert to list of dicts for processing (each item is already a dict)
         if not isinstance(releases_data, list):
@@ -461,28 +516,9 @@ def preview_csv():
             flash('No valid releases selected', 'error')
             return redirect(request.referrer or url_for('main.folders'))
 
-        # Process releases for CSV
+        # Process releases for CSV in a single batch; fetched releases already carry every required field
         processor = DiscogsCollectionProcessor()
-        csv_rows = []
-
-        for release in releases_data:
-            try:
-                # Create the expected format for extract_release_info (wrap in list)
-                release_format = [{
-                    'id': release.get('id'),
-                    'title': release.get('title'),
-                    'artist': release.get('artist'),
-                    'year': release.get('year'),
-                    'format': release.get('format', [])[0].get('name') if release.get('format') else None,
-                    'label': release.get('label'),
-                    'url': release.get('url')
-                }]
-                row = processor.extract_release_info(release_format)
-                if row:
-                    csv_rows.append(row[0])  # Extract the single dict from list
-            except Exception as e:
-                current_app.logger.warning(f"Error processing release: {str(e)}")
-                continue
+        csv_rows = processor.extract_release_info(releases_data)
 
         # Store preview data in session
         session['csv_preview'] = csv_rows
@@ -720,31 +756,9 @@ def generate_editable_csv():
             
             csv_rows.append(row_data)
         
-        # Generate CSV content
-        csv_buffer = io.StringIO()
-        writer = csv.writer(csv_buffer)
-        
-        # Write header
-        writer.writerow(header)
-        
-        # Write data rows
-        for row in csv_rows:
-            row_values = [row.get(field, '') for field in header]
-            writer.writerow(row_values)
-        
-        csv_content = csv_buffer.getvalue()
-
-        # Create filename with timestamp
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'discogs_collection_{timestamp}.csv'
-
-        # Return as downloadable file
-        return send_file(
-            io.BytesIO(csv_content.encode('utf-8')),
-            mimetype='text/csv',
-            as_attachment=True,
-            download_name=filename
-        )
+        # Stream the CSV as a downloadable file
+        rows = ([row.get(field, '') for field in header] for row in csv_rows)
+        return csv_download_response(iter_csv_lines(header, rows))
 
     except Exception as e:
         current_app.logger.error(f"Error generating editable CSV: {str(e)}")
@@ -767,42 +781,17 @@ def download_csv():
         return redirect(url_for('main.folders'))
 
     try:
-        # Generate CSV content in memory (as bytes)
-        import io
-
-        # Create CSV content directly (simplified approach)
-        csv_buffer = io.StringIO()
-
         # Add header from template
         with open('templates/qrfactory_discogs_collection_template.csv', 'r') as f:
             reader = csv.reader(f)
             header = next(reader)
 
-        writer = csv.writer(csv_buffer)
-        writer.writerow(header)
-
-        # Add data rows
-        for release in session['csv_preview']:
-            row = [
-                release.get('Artist', ''),
-                release.get('Title', ''),
-                release.get('URL', '')
-            ]
-            writer.writerow(row)
-
-        csv_content = csv_buffer.getvalue()
-
-        # Create filename with timestamp
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'discogs_collection_{timestamp}.csv'
-
-        # Return as downloadable file
-        return send_file(
-            io.BytesIO(csv_content.encode('utf-8')),
-            mimetype='text/csv',
-            as_attachment=True,
-            download_name=filename
+        # Stream data rows straight from the session instead of buffering the whole file
+        rows = (
+            [release.get('Artist', ''), release.get('Title', ''), release.get('URL', '')]
+            for release in session['csv_preview']
         )
+        return csv_download_response(iter_csv_lines(header, rows))
 
     except Exception as e:
         current_app.logger.error(f"Error generating CSV: {str(e)}")
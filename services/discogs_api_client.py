@@ -6,19 +6,29 @@ and retrieve collection information including releases organized by folders.
 The class handles both existing OAuth credentials and new OAuth flows when needed.
 """
 
+import dbm
 import os
-from typing import Dict, List, Optional
+import pickle
+import sys
+import shelve
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
 import logging
 from flask import current_app, has_app_context
 
-import discogs_client
-from discogs_client.models import CollectionFolder
-from discogs_client.exceptions import HTTPError, DiscogsAPIError
-
-from dotenv import load_dotenv, set_key, get_key
+# discogs_client and dotenv are imported inside the methods that need them to keep
+# importing this module cheap for code paths that never talk to the Discogs API
+if TYPE_CHECKING:
+    from discogs_client.models import CollectionFolder
 
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5000")
 DOTENV_PATH = "../.env"
+RELEASE_CACHE_PATH = os.path.expanduser("~/.cache/pyqrfactorydiscogs/releases.db")
+RELEASE_CACHE_MAX_AGE_DAYS = 30
+RELEASE_URL_PREFIX = "https://www.discogs.com/release/"
+
+# Errors from reading or writing the release cache; the cache is best effort, so these are logged and ignored
+RELEASE_CACHE_ERRORS = (OSError, *dbm.error, pickle.UnpicklingError, EOFError, KeyError)
 
 # Configure a fallback logger for non-Flask contexts
 fallback_logger = logging.getLogger(__name__)
@@ -46,7 +56,6 @@ def is_test_environment() -> bool:
         bool: True if running in test environment, False otherwise
     """
     # Check if we're running in a pytest context by checking if pytest is in the call stack
-    import sys
     is_pytest = any('pytest' in module.__name__ for module in sys.modules.values() if hasattr(module, '__name__'))
     
     # Also check environment variables as fallback
@@ -67,7 +76,8 @@ class DiscogsCollectionClient:
     to fetch collection items organized by folders from a user's Discogs account.
     """
 
-    def __init__(self, consumer_key: str, consumer_secret: str, useragent: str, oauth_token: Optional[str] = None, oauth_token_secret: Optional[str] = None) -> None:
+    def __init__(self, consumer_key: str, consumer_secret: str, useragent: str, oauth_token: Optional[str] = None, oauth_token_secret: Optional[str] = None,
+                 release_cache_path: Optional[str] = None, max_age_days: int = RELEASE_CACHE_MAX_AGE_DAYS) -> None:
         """
         Initialize the Discogs client with API credentials.
 
@@ -77,6 +87,9 @@ class DiscogsCollectionClient:
             useragent (str): The useragent to pass onto Discogs
             oauth_token (str, optional): The OAuth access token. Defaults to None.
             oauth_token_secret (str, optional): The OAuth access token secret. Defaults to None.
+            release_cache_path (str, optional): Path of the on-disk release cache. Defaults to None,
+                which uses RELEASE_CACHE_PATH outside of test environments.
+            max_age_days (int, optional): Number of days a cached release stays valid. Defaults to 30.
 
         Raises:
             ValueError: If credentials are empty or not strings
@@ -96,6 +109,46 @@ class DiscogsCollectionClient:
         self.oauth_token_secret = oauth_token_secret
         self.client = None
         self.user = None
+        self.release_cache_path = release_cache_path
+        self.max_age_days = max_age_days
+        self._release_cache = None
+        # Set once opening the cache fails, so it isn't retried for every release
+        self._release_cache_disabled = False
+
+    def _get_release_cache(self) -> Optional[shelve.Shelf]:
+        """
+        Lazily open the on-disk release cache.
+
+        Returns:
+            Optional[shelve.Shelf]: The opened cache, or None if caching is disabled or unavailable
+        """
+        if self._release_cache is not None or self._release_cache_disabled:
+            return self._release_cache
+
+        cache_path = self.release_cache_path
+        if cache_path is None:
+            # Don't touch the user's cache directory during tests
+            if is_test_environment():
+                return None
+            cache_path = RELEASE_CACHE_PATH
+
+        try:
+            os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+            self._release_cache = shelve.open(cache_path)
+        except RELEASE_CACHE_ERRORS as error:
+            logger.warning(f"Release cache unavailable at {cache_path}, caching disabled: {error}")
+            self._release_cache_disabled = True
+            return None
+
+        return self._release_cache
+
+    def close(self) -> None:
+        """
+        Close the on-disk release cache if it was opened.
+        """
+        if self._release_cache is not None:
+            self._release_cache.close()
+            self._release_cache = None
 
     def authenticate(self) -> None:
         """
@@ -103,7 +156,8 @@ class DiscogsCollectionClient:
 
         This method uses OAuth credentials passed during initialization.
         If no OAuth tokens were provided, it retrieves them from environment variables,
-        and if still not found, initiates an automatic OAuth flow without manual intervention.
+        and if still not found, initiates an OAuth flow. When stdin is a terminal the user is
+        prompted for the verification code, otherwise it is read from DISCOGS_OAUTH_VERIFIER.
 
         Returns:
             None: Sets up client authentication
@@ -112,6 +166,10 @@ class DiscogsCollectionClient:
             ConnectionError: If authentication fails
             ValueError: If consumer credentials are not set or invalid
         """
+        import discogs_client
+        from discogs_client.exceptions import HTTPError
+        from dotenv import load_dotenv
+
         try:
             # Load existing .env file
             load_dotenv(DOTENV_PATH)
@@ -175,13 +233,17 @@ class DiscogsCollectionClient:
                 print()
                 print(f"Please browse to the following URL: {url}")
 
-                accepted = "n"
-                while accepted.lower() == "n":
+                if sys.stdin.isatty():
                     print()
-                    accepted = input(f"Have you authorized me at {url} [y/n] :")
+                    input(f"Have you authorized me at {url}? Press Enter to continue: ")
 
-                # Get OAuth verifier from user
-                oauth_verifier = input("Verification code : ")
+                    # Get OAuth verifier from user
+                    oauth_verifier = input("Verification code : ")
+                else:
+                    # Non-interactive (CI, automated re-auth): take the verifier from the environment
+                    oauth_verifier = os.getenv("DISCOGS_OAUTH_VERIFIER", "").strip()
+                    if not oauth_verifier:
+                        raise ValueError("DISCOGS_OAUTH_VERIFIER must be set when not running interactively")
 
                 try:
                     self.oauth_token, self.oauth_token_secret = self.client.get_access_token(oauth_verifier)
@@ -235,6 +297,8 @@ class DiscogsCollectionClient:
         if not self.consumer_key or not self.consumer_secret:
             raise ValueError("Consumer key and secret must be set")
 
+        import discogs_client
+
         try:
             # Create client without OAuth tokens for initial authorization
             self.client = discogs_client.Client(
@@ -272,6 +336,8 @@ class DiscogsCollectionClient:
         if not self.oauth_token or not self.oauth_token_secret:
             raise ValueError("Request token and secret must be set before completing OAuth")
 
+        import discogs_client
+
         try:
             # Ensure client is initialized with request tokens
             if self.client is None:
@@ -303,7 +369,7 @@ class DiscogsCollectionClient:
         except Exception as error:
             raise ConnectionError(f"Failed to complete OAuth: {error}")
 
-    def get_collection_folders(self) -> List[CollectionFolder]:
+    def get_collection_folders(self) -> List["CollectionFolder"]:
         """
         Retrieve a list of all collection folders from the authenticated user's Discogs account.
 
@@ -317,6 +383,8 @@ class DiscogsCollectionClient:
         Raises:
             ConnectionError: If API request fails or user is not authenticated
         """
+        from discogs_client.exceptions import DiscogsAPIError
+
         if self.user is not None:
             try:
                 # Get all collection folders and their items
@@ -345,6 +413,8 @@ class DiscogsCollectionClient:
         Raises:
             ConnectionError: If API request fails or user is not authenticated
         """
+        from discogs_client.exceptions import DiscogsAPIError
+
         try:
             # Get all collection folders
             collection_folders = self.get_collection_folders()
@@ -376,6 +446,8 @@ class DiscogsCollectionClient:
             ConnectionError: If API request fails or user is not authenticated
             KeyError: If the specified folder_id doesn't exist in collection folders
         """
+        from discogs_client.exceptions import DiscogsAPIError
+
         try:
             # Get all collection folders first
             collection_folders = self.get_collection_folders()
@@ -403,7 +475,8 @@ class DiscogsCollectionClient:
                     'year': r.release.year,
                     'format': r.release.formats,
                     'label': r.release.labels[0].name if r.release.labels else None,
-                    'url': r.release.url.split('-', 1)[0],
+                    # Canonical release URL without the slug; avoids a lazy fetch of r.release.url
+                    'url': f"{RELEASE_URL_PREFIX}{r.id}",
                     'date_added': r.date_added
                 })
                 counter = counter + 1
@@ -436,6 +509,19 @@ class DiscogsCollectionClient:
         if self.client is None:
             raise ConnectionError("Client not initialized")
 
+        from discogs_client.exceptions import DiscogsAPIError
+
+        # Return the cached release if it is still fresh
+        release_cache = self._get_release_cache()
+        cache_key = str(release_id)
+        if release_cache is not None:
+            try:
+                cached = release_cache.get(cache_key)
+                if cached is not None and time.time() - cached['timestamp'] < self.max_age_days * 86400:
+                    return cached['data']
+            except RELEASE_CACHE_ERRORS as error:
+                logger.warning(f"Failed to read release {release_id} from cache: {error}")
+
         try:
             # Get the release from Discogs API
             rel_id = self.client.release(release_id)
@@ -448,9 +534,16 @@ class DiscogsCollectionClient:
                 'year': rel_id.year,
                 'format': rel_id.formats,
                 'label': rel_id.labels[0].name if rel_id.labels else None,
-                'url': rel_id.url.split('-', 1)[0]
+                'url': f"{RELEASE_URL_PREFIX}{rel_id.id}"
             }
 
+            if release_cache is not None:
+                try:
+                    release_cache[cache_key] = {'timestamp': time.time(), 'data': release_data}
+                    release_cache.sync()
+                except RELEASE_CACHE_ERRORS as error:
+                    logger.warning(f"Failed to write release {release_id} to cache: {error}")
+
             return release_data
 
         except DiscogsAPIError as error:
@@ -11,7 +11,8 @@ Classes:
 """
 
 import csv
-from typing import Dict, List
+import os
+from typing import Dict, List, TextIO, Tuple, Union
 import logging
 from flask import current_app, has_app_context
 
@@ -42,6 +43,8 @@ class DiscogsCollectionProcessor:
     It also provides methods to generate CSV files based on templates.
     """
 
+    __slots__ = ('_templates',)
+
     def __init__(self) -> None:
         """
         Initialize the Discogs collection processor.
@@ -49,7 +52,50 @@ class DiscogsCollectionProcessor:
         Args:
             None: This class doesn't require any initialization parameters
         """
-        pass
+        # Parsed templates keyed by path, so batched CSV generation reads each template once
+        self._templates: Dict[str, Tuple[List[str], List[str]]] = {}
+
+    def load_template(self, template_path: str) -> Tuple[List[str], List[str]]:
+        """
+        Read and validate the header and format line of a CSV template.
+
+        Args:
+            template_path (str): Path to the CSV template file containing header and format line
+
+        Returns:
+            Tuple[List[str], List[str]]: The template header and format line
+
+        Raises:
+            ValueError: If template format line doesn't contain required placeholders {artist}, {title}, and {url}
+            FileNotFoundError: If template file doesn't exist
+            IOError: If there are issues reading the template
+
+        Note:
+            The parsed template is cached on the processor instance, so subsequent calls
+            with the same path don't reopen the file.
+        """
+        if template_path in self._templates:
+            return self._templates[template_path]
+
+        try:
+            with open(template_path, 'r', encoding='utf-8') as template_file:
+                reader = csv.reader(template_file)
+                template_header = next(reader)  # Get first line (header)
+                template_format_line = next(reader)  # Get second line (format)
+
+                # Validate template format contains required placeholders
+                if '{artist}' not in ','.join(template_format_line) or '{title}' not in ','.join(template_format_line):
+                    raise ValueError("Template format line must contain {artist} and {title} placeholders")
+                if '{url}' not in ','.join(template_format_line):
+                    raise ValueError("Template format line must contain {url} placeholder")
+
+        except FileNotFoundError as error:
+            raise FileNotFoundError(f"Template file not found: {error}")
+        except IOError as error:
+            raise IOError(f"Failed to read template file: {error}")
+
+        self._templates[template_path] = (template_header, template_format_line)
+        return template_header, template_format_line
 
     def extract_release_info(self, release_data: List[Dict]) -> List[Dict]:
         """
@@ -102,7 +148,7 @@ class DiscogsCollectionProcessor:
 
         return extracted_info
 
-    def generate_collection_csv(self, release_data: List[Dict], template_path: str, output_path: str) -> None:
+    def generate_collection_csv(self, release_data: List[Dict], template_path: str, output_path: Union[str, os.PathLike, TextIO]) -> None:
         """
         Generate a CSV file based on the Discogs collection template.
 
@@ -110,10 +156,11 @@ class DiscogsCollectionProcessor:
             release_data (List[Dict]): List of release dictionaries containing 'artist',
                 'title', 'year', 'url', and 'id' fields. Other fields are ignored.
             template_path (str): Path to the CSV template file containing header and format line
-            output_path (str): Path where the generated CSV should be saved
+            output_path (Union[str, os.PathLike, TextIO]): Path where the generated CSV should be saved,
+                or an open text file object to write the CSV to
 
         Returns:
-            None: Writes CSV file to specified path
+            None: Writes CSV file to specified path or file object
 
         Raises:
             ValueError: If input data is not a list or contains invalid entries,
@@ -128,27 +175,14 @@ class DiscogsCollectionProcessor:
             These placeholders are replaced with actual values from each release entry.
             The resulting CSV will have one row per release containing artist, title, year, URL, and filename information.
             The {filename} placeholder is replaced with the release ID.
+            A file object passed as output_path is written to but not closed.
         """
         if not isinstance(release_data, list):
             raise ValueError("release_data must be a list")
 
-        # Read template header and format line
-        try:
-            with open(template_path, 'r', encoding='utf-8') as template_file:
-                reader = csv.reader(template_file)
-                template_header = next(reader)  # Get first line (header)
-                template_format_line = next(reader)  # Get second line (format)
-
-                # Validate template format contains required placeholders
-                if '{artist}' not in ','.join(template_format_line) or '{title}' not in ','.join(template_format_line):
-                    raise ValueError("Template format line must contain {artist} and {title} placeholders")
-                if '{url}' not in ','.join(template_format_line):
-                    raise ValueError("Template format line must contain {url} placeholder")
-
-        except FileNotFoundError as error:
-            raise FileNotFoundError(f"Template file not found: {error}")
-        except IOError as error:
-            raise IOError(f"Failed to read template file: {error}")
+        # Read template header and format line (cached per template path)
+        template_header, template_format_line = self.load_template(template_path)
+        template_str = ','.join(template_format_line)
 
         # Generate CSV content
         csv_content = []
@@ -169,7 +203,6 @@ class DiscogsCollectionProcessor:
             filename = release.get('id', '')
 
             # Create new line by replacing placeholders in the format template
-            template_str = ','.join(template_format_line)
             new_line = template_str.replace('{artist}', str(artist))
             new_line = new_line.replace('{title}', str(title))
             new_line = new_line.replace('{year}', str(year))
@@ -180,6 +213,11 @@ class DiscogsCollectionProcessor:
 
             csv_content.append(new_line)
 
+        # Write to an already open file object as is
+        if hasattr(output_path, 'write'):
+            csv.writer(output_path).writerows(csv_content)
+            return
+
         # Write CSV file
         try:
             with open(output_path, 'w', encoding='utf-8', newline='') as output_file:
@@ -4,40 +4,75 @@ Pytest configuration and shared fixtures for the Discogs Collection to QR Factor
 This file contains shared fixtures and configuration that can be used across all test files.
 """
 
-import os
-import sys
 import pytest
-from unittest.mock import Mock, patch
+from types import SimpleNamespace
+from unittest.mock import MagicMock
 
-# Add project root to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+@pytest.fixture(scope="session", autouse=True)
+def _preload_modules():
+    """Fixture importing the application modules once per session, so patch targets resolve from sys.modules"""
+    import app  # noqa: F401
+    import app.routes  # noqa: F401
+    import services.discogs_api_client  # noqa: F401
+    import services.discogs_collection_processor  # noqa: F401
 
-@pytest.fixture
-def mock_discogs_client():
-    """Fixture for creating a mocked DiscogsCollectionClient"""
+
+@pytest.fixture(scope="session", autouse=True)
+def _no_backoff_sleep():
+    """Fixture turning the discogs_client rate-limit backoff sleep into a no-op for the whole session"""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr('discogs_client.utils.sleep', lambda seconds: None)
+        yield
+
+
+@pytest.fixture(scope="session")
+def discogs_client_cls():
+    """Fixture providing the DiscogsCollectionClient class, imported on first use instead of at collection"""
     from services.discogs_api_client import DiscogsCollectionClient
     
-    # Create client with test credentials
-    client = DiscogsCollectionClient(
-        consumer_key="test_key",
-        consumer_secret="test_secret"
-    )
-    
-    return client
+    return DiscogsCollectionClient
+
+
+@pytest.fixture(scope="session")
+def base_credentials():
+    """Fixture providing the consumer credentials and user agent used to build test clients (read-only)"""
+    return {
+        'consumer_key': "test_key",
+        'consumer_secret': "test_secret",
+        'useragent': "pyqrfactorydiscogs/1.0"
+    }
 
 
 @pytest.fixture
-def mock_discogs_collection_processor():
-    """Fixture for creating a DiscogsCollectionProcessor instance"""
+def client(discogs_client_cls, base_credentials):
+    """Fixture for a fresh DiscogsCollectionClient without OAuth tokens"""
+    return discogs_client_cls(**base_credentials)
+
+
+@pytest.fixture(scope="session")
+def shared_client(discogs_client_cls, base_credentials):
+    """Fixture for a DiscogsCollectionClient shared read-only across the session; patch its methods with patch.object"""
+    return discogs_client_cls(**base_credentials)
+
+
+@pytest.fixture(scope="session")
+def processor():
+    """Fixture for a DiscogsCollectionProcessor shared across the session; tests only add to its path-keyed template cache"""
     from services.discogs_collection_processor import DiscogsCollectionProcessor
     
     return DiscogsCollectionProcessor()
 
 
 @pytest.fixture
+def stub_processor():
+    """Fixture providing a processor stub whose extract_release_info returns its input unchanged"""
+    return SimpleNamespace(extract_release_info=lambda release_data: release_data)
+
+
+@pytest.fixture(scope="session")
 def mock_release_data():
-    """Fixture providing sample release data for testing"""
+    """Fixture providing sample release data for testing (read-only)"""
     return [
         {
             'id': 100,
@@ -60,24 +95,176 @@ def mock_release_data():
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def mock_sorting_release_data():
+    """Fixture providing minimal releases (only fields the releases page sorts on) for sorting tests (read-only)"""
+    return {
+        0: {
+            'id': 100,
+            'title': 'Album One',
+            'artist': 'Muse',
+            'year': 2015,
+            'date_added': '2020-01-01'
+        },
+        1: {
+            'id': 101,
+            'title': 'Album Two',
+            'artist': 'Muse',
+            'year': 2009,
+            'date_added': '2018-01-01'
+        },
+        2: {
+            'id': 102,
+            'title': 'Album Three',
+            'artist': 'Muse',
+            'year': 2012,
+            'date_added': '2022-01-01'
+        },
+        3: {
+            'id': 103,
+            'title': 'Album Four',
+            'artist': 'Beatles',
+            'year': 1969,
+            'date_added': '2019-01-01'
+        },
+        4: {
+            'id': 104,
+            'title': 'Album Five',
+            'artist': 'Beatles',
+            'year': 1967,
+            'date_added': '2017-01-01'
+        },
+        5: {
+            'id': 105,
+            'title': 'Album Six',
+            'artist': 'Beatles',
+            'year': 1971,
+            'date_added': '2021-01-01'
+        }
+    }
+
+
+@pytest.fixture(scope="session")
+def mock_letter_release_data():
+    """Fixture providing releases by artists starting with different letters, for letter selection tests (read-only)"""
+    return {
+        0: {
+            'id': 100,
+            'title': 'Album One',
+            'artist': 'Artist One',
+            'year': 2020,
+            'format': [{'name': 'Vinyl', 'qty': '1'}],
+            'label': 'Label One',
+            'url': 'https://www.discogs.com/release/100-Artist-One-Album-One'
+        },
+        1: {
+            'id': 101,
+            'title': 'Beatles Album',
+            'artist': 'Beatles',
+            'year': 2021,
+            'format': [{'name': 'Vinyl', 'qty': '1'}],
+            'label': 'Label Two',
+            'url': 'https://www.discogs.com/release/101-Beatles-Album'
+        },
+        2: {
+            'id': 102,
+            'title': 'Muse Album',
+            'artist': 'Muse',
+            'year': 2022,
+            'format': [{'name': 'Vinyl', 'qty': '1'}],
+            'label': 'Label Three',
+            'url': 'https://www.discogs.com/release/102-Muse-Album'
+        },
+        3: {
+            'id': 103,
+            'title': 'Numeric Band',
+            'artist': '123 Band',
+            'year': 2023,
+            'format': [{'name': 'Vinyl', 'qty': '1'}],
+            'label': 'Label Four',
+            'url': 'https://www.discogs.com/release/103-123-Band'
+        }
+    }
+
+
+@pytest.fixture(scope="session")
 def mock_folders():
-    """Fixture providing mock collection folders"""
+    """Fixture providing mock collection folders (read-only)"""
     return [
-        Mock(id=1, name="Favorites"),
-        Mock(id=2, name="Vinyl Collection"),
-        Mock(id=3, name="Digital Music")
+        SimpleNamespace(id=1, name="Favorites"),
+        SimpleNamespace(id=2, name="Vinyl Collection"),
+        SimpleNamespace(id=3, name="Digital Music")
     ]
 
 
-@pytest.fixture
-def flask_test_client():
-    """Fixture for Flask test client"""
+@pytest.fixture(scope="session")
+def flask_app(tmp_path_factory):
+    """Fixture for the Flask application, created once per test session"""
     from app import create_app
+    from jinja2 import FileSystemBytecodeCache
     
     app = create_app()
-    app.config['TESTING'] = True
-    app.config['WTF_CSRF_ENABLED'] = False
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False, TEMPLATES_AUTO_RELOAD=False)
+    
+    # Templates don't change during a test run: skip the per-render stat and cache compiled bytecode
+    app.jinja_env.auto_reload = False
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(str(tmp_path_factory.mktemp("jinja_cache")))
+    
+    return app
+
+
+@pytest.fixture(scope="session")
+def _session_test_client(flask_app):
+    """Fixture for the Flask test client, created once per test session"""
+    return flask_app.test_client()
+
+
+@pytest.fixture
+def flask_test_client(_session_test_client):
+    """Fixture for Flask test client, with the session cleared so no state leaks between tests"""
+    with _session_test_client.session_transaction() as sess:
+        sess.clear()
+    
+    return _session_test_client
+
+
+@pytest.fixture(scope="session")
+def _authed_session_cookie(flask_app):
+    """Fixture providing an authenticated session cookie value, signed once per session"""
+    serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+    
+    return serializer.dumps({
+        'oauth_token': 'test_token',
+        'oauth_secret': 'test_secret',
+        'consumer_key': 'test_key',
+        'consumer_secret': 'test_secret'
+    })
+
+
+@pytest.fixture
+def authed_client(flask_app, _session_test_client, _authed_session_cookie):
+    """Fixture for a Flask test client with an authenticated session, replacing any session left by a previous test"""
+    _session_test_client.set_cookie(flask_app.config['SESSION_COOKIE_NAME'], _authed_session_cookie)
+    
+    return _session_test_client
+
+
+@pytest.fixture(scope="module")
+def _patched_routes_client_class(flask_app, shared_client):
+    """Fixture replacing the app's Discogs client class once per test module"""
+    # Swap the class in the app's extensions; no module attribute is patched
+    original = flask_app.extensions['discogs_client_cls']
+    mock_client_class = MagicMock(return_value=MagicMock(spec=shared_client))
+    flask_app.extensions['discogs_client_cls'] = mock_client_class
+    yield mock_client_class
+    flask_app.extensions['discogs_client_cls'] = original
+
+
+@pytest.fixture
+def patched_routes_client(_patched_routes_client_class):
+    """Fixture returning the mocked client instance used by the routes, reset for each test"""
+    _patched_routes_client_class.reset_mock(side_effect=True)
+    mock_client = _patched_routes_client_class.return_value
+    mock_client.reset_mock(return_value=True, side_effect=True)
     
-    with app.test_client() as client:
-        yield client
\ No newline at end of file
+    return mock_client
@@ -4,7 +4,38 @@ Integration tests for Flask application.
 Tests the Flask routes and application functionality.
 """
 
-from unittest.mock import patch, MagicMock
+import re
+import pytest
+from types import SimpleNamespace
+
+# Element ids of the letter selection UI on the releases page
+_LETTER_UI_IDS = frozenset({
+    b'letter-dropdown-container',
+    b'letter-dropdown-button',
+    b'letter-dropdown-menu',
+    b'letter-search',
+    b'letter-options',
+    b'clear-letter-selection',
+    b'select-by-letter',
+    b'deselect-by-letter'
+})
+_ELEMENT_ID_RE = re.compile(rb'id="([^"]+)"')
+
+# Expected page texts in document order, matched in a single scan per response
+_LANDING_PAGE_RE = re.compile(
+    rb'Discogs Collection to QR Factory CSV Generator[\s\S]*Select Releases by Folders[\s\S]*Select Releases by Date Added'
+)
+_AUTHENTICATE_PAGE_RE = re.compile(rb'Consumer Key:[\s\S]*Consumer Secret:')
+_LETTER_UI_TEXT_RE = re.compile(rb'Select by Artist Starting Letter:[\s\S]*Select Letters')
+
+
+def _first_positions(data, tokens):
+    """Return the index of the first occurrence of each token in the raw response bytes, found in a single scan"""
+    pattern = re.compile(b'|'.join(re.escape(token.encode('utf-8')) for token in tokens))
+    positions = {}
+    for match in pattern.finditer(data):
+        positions.setdefault(match.group(0).decode('utf-8'), match.start())
+    return positions
 
 
 class TestFlaskApp:
@@ -14,28 +45,13 @@ class TestFlaskApp:
         """Test the landing route"""
         response = flask_test_client.get('/')
         assert response.status_code == 200
-        assert b'Discogs Collection to QR Factory CSV Generator' in response.data
-        assert b'Select Releases by Folders' in response.data
-        assert b'Select Releases by Date Added' in response.data
+        assert _LANDING_PAGE_RE.search(response.data) is not None
 
     def test_authenticate_page_route(self, flask_test_client):
         """Test the authentication page route"""
         response = flask_test_client.get('/authenticate-page')
         assert response.status_code == 200
-        assert b'Consumer Key:' in response.data
-        assert b'Consumer Secret:' in response.data
-
-    def test_select_by_folders_route_unauthenticated(self, flask_test_client):
-        """Test select by folders route when not authenticated"""
-        response = flask_test_client.get('/select-by-folders')
-        # Should redirect to authentication page
-        assert response.status_code == 302
-
-    def test_select_by_date_route_unauthenticated(self, flask_test_client):
-        """Test select by date route when not authenticated"""
-        response = flask_test_client.get('/select-by-date')
-        # Should redirect to authentication page
-        assert response.status_code == 302
+        assert _AUTHENTICATE_PAGE_RE.search(response.data) is not None
 
     def test_health_check_route(self, flask_test_client):
         """Test the health check endpoint"""
@@ -48,387 +64,201 @@ class TestFlaskApp:
         response = flask_test_client.post('/authenticate', data={
             'consumer_key': '',
             'consumer_secret': ''
-        }, follow_redirects=True)
+        })
         
-        assert response.status_code == 200
-        assert b'Consumer key and secret are required' in response.data
+        # Should redirect back to the authentication page with an error flashed
+        assert response.status_code == 302
+        assert response.headers['Location'] == '/authenticate-page'
+        with flask_test_client.session_transaction() as sess:
+            assert ('error', 'Consumer key and secret are required') in sess['_flashes']
 
-    def test_authenticate_route_valid_credentials(self, flask_test_client):
+    def test_authenticate_route_valid_credentials(self, flask_test_client, patched_routes_client, monkeypatch):
         """Test authentication with valid credentials"""
-        with patch('app.routes.DiscogsCollectionClient') as mock_client_class:
-            # Mock the client
-            mock_client = MagicMock()
-            mock_client_class.return_value = mock_client
-             
-            # Mock authentication
-            mock_client.authenticate.return_value = None
-            mock_client.user = MagicMock()
-            mock_client.user.username = "test_user"
-             
-            response = flask_test_client.post('/authenticate', data={
-                'consumer_key': 'test_key',
-                'consumer_secret': 'test_secret'
-            }, follow_redirects=True)
-             
-            assert response.status_code == 200
-            # Should redirect to landing page after successful authentication
-            assert b'Select Releases by Folders' in response.data or b'Select Releases by Date Added' in response.data
+        # No stored OAuth tokens, so the web-based OAuth flow is started
+        monkeypatch.setattr('app.routes.get_key', lambda *args, **kwargs: None)
+        authorize_url = "https://www.discogs.com/oauth/authorize?oauth_token=request_token"
+        patched_routes_client.get_authorize_url_with_callback.return_value = ("request_token", "request_secret", authorize_url)
+         
+        response = flask_test_client.post('/authenticate', data={
+            'consumer_key': 'test_key',
+            'consumer_secret': 'test_secret'
+        })
+         
+        # Should redirect to the Discogs authorization page
+        assert response.status_code == 302
+        assert response.headers['Location'] == authorize_url
 
-    def test_folders_route_unauthenticated(self, flask_test_client):
-        """Test folders route when not authenticated"""
-        response = flask_test_client.get('/folders')
-        # Should redirect to index
+    @pytest.mark.parametrize("path", ['/select-by-folders', '/select-by-date', '/folders', '/releases/1'])
+    def test_protected_route_unauthenticated(self, flask_test_client, path):
+        """Test that protected routes redirect when not authenticated"""
+        response = flask_test_client.get(path)
+        # Should redirect to index or authentication page
         assert response.status_code == 302
 
-    def test_folders_route_authenticated(self, flask_test_client):
-        """Test folders route when authenticated"""
-        with flask_test_client.session_transaction() as sess:
-            sess['oauth_token'] = 'test_token'
-            sess['oauth_secret'] = 'test_secret'
-            sess['consumer_key'] = 'test_key'
-            sess['consumer_secret'] = 'test_secret'
-         
-        with patch('app.routes.DiscogsCollectionClient') as mock_client_class:
-            # Mock the client
-            mock_client = MagicMock()
-            mock_client_class.return_value = mock_client
-            
-            # Mock folder retrieval
-            mock_folder1 = MagicMock()
-            mock_folder1.id = 1
-            mock_folder1.name = "Favorites"
-            
-            mock_folder2 = MagicMock()
-            mock_folder2.id = 2
-            mock_folder2.name = "Vinyl Collection"
-            
-            mock_client.get_collection_folders.return_value = [mock_folder1, mock_folder2]
-            
-            response = flask_test_client.get('/folders')
-            assert response.status_code == 200
-            assert b'Favorites' in response.data
-            assert b'Vinyl Collection' in response.data
+    @pytest.mark.parametrize("path, mock_method, key", [
+        ('/folders?format=json', 'get_collection_folders', 'folders'),
+        ('/releases/1?format=json', 'get_collection_releases_by_folder', 'releases')
+    ], ids=['folders', 'releases'])
+    def test_protected_route_authenticated(self, authed_client, patched_routes_client, mock_folders, mock_release_data, path, mock_method, key):
+        """Test that protected routes return the mocked collection data as JSON when authenticated"""
+        # Mocked client return value and the expected JSON list for each route
+        cases = {
+            'folders': (
+                mock_folders,
+                [{'id': 1, 'name': 'Favorites'}, {'id': 2, 'name': 'Vinyl Collection'}, {'id': 3, 'name': 'Digital Music'}]
+            ),
+            # Folder releases are keyed by position; the route returns them as a list sorted by artist
+            'releases': (dict(enumerate(mock_release_data)), mock_release_data)
+        }
+        mock_return, expected = cases[key]
+        getattr(patched_routes_client, mock_method).return_value = mock_return
+        
+        response = authed_client.get(path)
+        assert response.status_code == 200
+        assert response.get_json()[key] == expected
 
-    def test_releases_route_unauthenticated(self, flask_test_client):
-        """Test releases route when not authenticated"""
-        response = flask_test_client.get('/releases/1')
-        # Should redirect to index
-        assert response.status_code == 302
+    @pytest.mark.parametrize("path, mock_method, mock_return, expected", [
+        ('/folders?format=json', 'get_collection_folders', [], {'folders': []}),
+        ('/releases/1?format=json', 'get_collection_releases_by_folder', {}, {'folder_id': 1, 'releases': []})
+    ], ids=['folders', 'releases'])
+    def test_protected_route_authenticated_empty_json(self, authed_client, patched_routes_client, path, mock_method, mock_return, expected):
+        """Test that empty collections and folders are returned as empty JSON lists instead of redirecting"""
+        getattr(patched_routes_client, mock_method).return_value = mock_return
+        
+        response = authed_client.get(path)
+        assert response.status_code == 200
+        assert response.get_json() == expected
 
-    def test_releases_route_authenticated(self, flask_test_client):
-        """Test releases route when authenticated"""
-        with flask_test_client.session_transaction() as sess:
-            sess['oauth_token'] = 'test_token'
-            sess['oauth_secret'] = 'test_secret'
-            sess['consumer_key'] = 'test_key'
-            sess['consumer_secret'] = 'test_secret'
-         
-        with patch('app.routes.DiscogsCollectionClient') as mock_client_class:
-            # Mock the client
-            mock_client = MagicMock()
-            mock_client_class.return_value = mock_client
-            
-            # Mock release retrieval
-            mock_release_data = {
-                0: {
-                    'id': 100,
-                    'title': 'Album One',
-                    'artist': 'Artist One',
-                    'year': 2020,
-                    'format': [{'name': 'Vinyl', 'qty': '1'}],
-                    'label': 'Label One',
-                    'url': 'https://www.discogs.com/release/100-Artist-One-Album-One'
-                }
-            }
-            
-            mock_client.get_collection_releases_by_folder.return_value = mock_release_data
-            
-            response = flask_test_client.get('/releases/1')
-            assert response.status_code == 200
-            assert b'Album One' in response.data
-            assert b'Artist One' in response.data
+    def test_folders_page_authenticated(self, authed_client, patched_routes_client, mock_folders):
+        """Test that the folders page renders the collection folders as HTML when authenticated"""
+        patched_routes_client.get_collection_folders.return_value = mock_folders[:2]
+        
+        response = authed_client.get('/folders')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/html'
+        assert b'Favorites' in response.data
+        assert b'Vinyl Collection' in response.data
 
-    def test_generate_csv_route(self, flask_test_client):
+    def test_generate_csv_route(self, authed_client, mock_release_data, monkeypatch):
         """Test CSV generation route"""
-        with flask_test_client.session_transaction() as sess:
-            sess['oauth_token'] = 'test_token'
-            sess['oauth_secret'] = 'test_secret'
-            sess['consumer_key'] = 'test_key'
-            sess['consumer_secret'] = 'test_secret'
-         
         # Mock form data
         test_data = {
             'release_ids': ['100', '101'],
             'sort_by': 'year',
             'sort_order': 'desc'
         }
-         
-        with patch('app.routes.DiscogsCollectionClient') as mock_client_class, \
-             patch('app.routes.DiscogsCollectionProcessor') as mock_processor_class:
-             
-            # Mock the client
-            mock_client = MagicMock()
-            mock_client_class.return_value = mock_client
-            
-            # Mock the processor
-            mock_processor = MagicMock()
-            mock_processor_class.return_value = mock_processor
-            
-            # Mock release data
-            mock_release_data = [
-                {
-                    'id': 100,
-                    'title': 'Album One',
-                    'artist': 'Artist One',
-                    'year': 2020,
-                    'format': [{'name': 'Vinyl', 'qty': '1'}],
-                    'label': 'Label One',
-                    'url': 'https://www.discogs.com/release/100-Artist-One-Album-One'
-                }
-            ]
-            
-            def get_release_mock(rid):
-                return next((r for r in mock_release_data if r['id'] == rid), None)
-            
-            mock_client.get_release_by_releaseid.side_effect = get_release_mock
-            
-            # Mock extracted info
-            mock_processor.extract_release_info.return_value = [
-                {
-                    'artist': 'Artist One',
-                    'title': 'Album One',
-                    'url': 'https://www.discogs.com/release/100-Artist-One-Album-One'
-                }
+        
+        # Index the releases by id once so each lookup is O(1)
+        releases_by_id = {r['id']: r for r in mock_release_data}
+        
+        # Mock extracted info
+        extracted_info = [
+            {
+                'artist': 'Artist One',
+                'title': 'Album One',
+                'url': 'https://www.discogs.com/release/100-Artist-One-Album-One'
+            }
+        ]
+        
+        # Plain stubs for the client and processor; the route only calls these methods
+        client_stub = SimpleNamespace(authenticate=lambda: None, get_release_by_releaseid=releases_by_id.get, close=lambda: None)
+        processor_stub = SimpleNamespace(extract_release_info=lambda release_data: extracted_info)
+        monkeypatch.setitem(authed_client.application.extensions, 'discogs_client_cls', lambda *args, **kwargs: client_stub)
+        monkeypatch.setattr('app.routes.DiscogsCollectionProcessor', lambda *args, **kwargs: processor_stub)
+        
+        # Follow the redirect so the editable preview page is rendered end to end
+        response = authed_client.post('/preview/?release_ids=100&release_ids=101', data=test_data, follow_redirects=True)
+        
+        # Should store the preview in the session and render the editable preview
+        assert response.status_code == 200
+        assert response.request.path == '/editable-preview/'
+        assert b'Artist One' in response.data
+        assert b'Album One' in response.data
+        with authed_client.session_transaction() as sess:
+            assert sess['csv_preview'] == extracted_info
+
+    def test_download_csv_route_streams(self, authed_client):
+        """Test that the CSV download is streamed one line at a time"""
+        with authed_client.session_transaction() as sess:
+            sess['csv_preview'] = [
+                {'Artist': 'Artist One', 'Title': 'Album One', 'URL': 'https://www.discogs.com/release/100'},
+                {'Artist': 'Artist Two', 'Title': 'Album Two', 'URL': 'https://www.discogs.com/release/101'}
             ]
-            
-            response = flask_test_client.post('/preview/?release_ids=100&release_ids=101', data=test_data, follow_redirects=True)
-            
-            # Should redirect to editable preview
-            assert response.status_code == 200
-            assert b'Artist One' in response.data or b'Album One' in response.data
+        
+        response = authed_client.post('/download-csv', buffered=False)
+        
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == 'text/csv'
+        assert response.headers['Content-Disposition'].startswith('attachment; filename=discogs_collection_')
+        
+        # Header line first, then one chunk per release
+        chunks = list(response.response)
+        assert len(chunks) == 3
+        assert chunks[0].startswith(b'Type,OutputSize,FileType')
+        assert chunks[1] == b'Artist One,Album One,https://www.discogs.com/release/100\r\n'
+        response.close()
 
-    def test_releases_sorting_functionality(self, flask_test_client):
-            """Test releases sorting functionality"""
-            with flask_test_client.session_transaction() as sess:
-                sess['oauth_token'] = 'test_token'
-                sess['oauth_secret'] = 'test_secret'
-                sess['consumer_key'] = 'test_key'
-                sess['consumer_secret'] = 'test_secret'
-              
-            with patch('app.routes.DiscogsCollectionClient') as mock_client_class:
-                # Mock the client
-                mock_client = MagicMock()
-                mock_client_class.return_value = mock_client
-                
-                # Mock release retrieval with multiple releases including same artist with different years
-                mock_release_data = {
-                    0: {
-                        'id': 100,
-                        'title': 'Album One',
-                        'artist': 'Muse',
-                        'year': 2015,
-                        'format': [{'name': 'Vinyl', 'qty': '1'}],
-                        'label': 'Label One',
-                        'url': 'https://www.discogs.com/release/100-Muse-Album-One',
-                        'date_added': '2020-01-01'
-                    },
-                    1: {
-                        'id': 101,
-                        'title': 'Album Two',
-                        'artist': 'Muse',
-                        'year': 2009,
-                        'format': [{'name': 'CD', 'qty': '1'}],
-                        'label': 'Label Two',
-                        'url': 'https://www.discogs.com/release/101-Muse-Album-Two',
-                        'date_added': '2018-01-01'
-                    },
-                    2: {
-                        'id': 102,
-                        'title': 'Album Three',
-                        'artist': 'Muse',
-                        'year': 2012,
-                        'format': [{'name': 'Vinyl', 'qty': '1'}],
-                        'label': 'Label Three',
-                        'url': 'https://www.discogs.com/release/102-Muse-Album-Three',
-                        'date_added': '2022-01-01'
-                    },
-                    3: {
-                        'id': 103,
-                        'title': 'Album Four',
-                        'artist': 'Beatles',
-                        'year': 1969,
-                        'format': [{'name': 'Vinyl', 'qty': '1'}],
-                        'label': 'Label Four',
-                        'url': 'https://www.discogs.com/release/103-Beatles-Album-Four',
-                        'date_added': '2019-01-01'
-                    },
-                    4: {
-                        'id': 104,
-                        'title': 'Album Five',
-                        'artist': 'Beatles',
-                        'year': 1967,
-                        'format': [{'name': 'Vinyl', 'qty': '1'}],
-                        'label': 'Label Five',
-                        'url': 'https://www.discogs.com/release/104-Beatles-Album-Five',
-                        'date_added': '2017-01-01'
-                    },
-                    5: {
-                        'id': 105,
-                        'title': 'Album Six',
-                        'artist': 'Beatles',
-                        'year': 1971,
-                        'format': [{'name': 'Vinyl', 'qty': '1'}],
-                        'label': 'Label Six',
-                        'url': 'https://www.discogs.com/release/105-Beatles-Album-Six',
-                        'date_added': '2021-01-01'
-                    }
-                }
-                
-                mock_client.get_collection_releases_by_folder.return_value = mock_release_data
-                
-                # Test default sorting (artist A-Z)
-                response = flask_test_client.get('/releases/1')
-                assert response.status_code == 200
-                # Should show artists in alphabetical order (Beatles, Muse)
-                data = response.data.decode('utf-8')
-                
-                # Check that Beatles come before Muse (alphabetical order)
-                beatles_pos = data.find('Beatles')
-                muse_pos = data.find('Muse')
-                assert beatles_pos > 0 and muse_pos > 0
-                assert beatles_pos < muse_pos
-                
-                # Test oldest first sorting
-                response = flask_test_client.get('/releases/1?sort=oldest_first')
-                assert response.status_code == 200
-                # Should show oldest first (1967, 1969, 1971, 2009, 2012, 2015)
-                data = response.data.decode('utf-8')
-                year_positions = []
-                for year in ['1967', '1969', '1971', '2009', '2012', '2015']:
-                    year_positions.append((year, data.find(year)))
-                # Check that years appear in ascending order
-                assert year_positions[0][1] < year_positions[1][1] < year_positions[2][1] < year_positions[3][1] < year_positions[4][1] < year_positions[5][1]
-                
-                # Test artist A-Z sorting with secondary year sorting
-                response = flask_test_client.get('/releases/1?sort=artist_az')
-                assert response.status_code == 200
-                # Should show artists in alphabetical order (Beatles, Muse)
-                # And within each artist, albums should be sorted by year (oldest to newest)
-                data = response.data.decode('utf-8')
-                
-                # Check that Beatles come before Muse (alphabetical order)
-                beatles_pos = data.find('Beatles')
-                muse_pos = data.find('Muse')
-                assert beatles_pos > 0 and muse_pos > 0
-                assert beatles_pos < muse_pos
-                
-                # Check that Beatles albums are sorted by year (1967, 1969, 1971)
-                year_1967_pos = data.find('1967')
-                year_1969_pos = data.find('1969')
-                year_1971_pos = data.find('1971')
-                assert year_1967_pos > 0 and year_1969_pos > 0 and year_1971_pos > 0
-                assert year_1967_pos < year_1969_pos < year_1971_pos
-                
-                # Test artist Z-A sorting with secondary year sorting
-                response = flask_test_client.get('/releases/1?sort=artist_za')
-                assert response.status_code == 200
-                # Should show artists in reverse alphabetical order (Muse, Beatles)
-                # And within each artist, albums should be sorted by year (newest to oldest)
-                data = response.data.decode('utf-8')
-                
-                # Check that Muse comes before Beatles (reverse alphabetical order)
-                muse_pos = data.find('Muse')
-                beatles_pos = data.find('Beatles')
-                assert muse_pos > 0 and beatles_pos > 0
-                assert muse_pos < beatles_pos
-                
-                # Check that Muse albums are sorted by year (2015, 2012, 2009)
-                year_2015_pos = data.find('2015')
-                year_2012_pos = data.find('2012')
-                year_2009_pos = data.find('2009')
-                assert year_2015_pos > 0 and year_2012_pos > 0 and year_2009_pos > 0
-                assert year_2015_pos < year_2012_pos < year_2009_pos
-                
-                # Test date added sorting
-                response = flask_test_client.get('/releases/1?sort=date_added')
-                assert response.status_code == 200
-                # Should show most recently added first (2022, 2021, 2020, 2019, 2018, 2017)
-                data = response.data.decode('utf-8')
-                date_positions = []
-                for date in ['2022-01-01', '2021-01-01', '2020-01-01', '2019-01-01', '2018-01-01', '2017-01-01']:
-                    date_positions.append((date, data.find(date)))
-                # Check that dates appear in descending order (newest added first)
-                assert date_positions[0][1] < date_positions[1][1] < date_positions[2][1] < date_positions[3][1] < date_positions[4][1] < date_positions[5][1]
+    def test_releases_sorting_functionality(self, authed_client, patched_routes_client, mock_sorting_release_data):
+        """Test releases sorting functionality"""
+        patched_routes_client.get_collection_releases_by_folder.return_value = mock_sorting_release_data
+        
+        # Test default sorting, which is artist A-Z with secondary year sorting
+        response = authed_client.get('/releases/1')
+        assert response.status_code == 200
+        # Should show artists in alphabetical order (Beatles, Muse)
+        # And within each artist, albums should be sorted by year (oldest to newest)
+        positions = _first_positions(response.data, ['Beatles', 'Muse', '1967', '1969', '1971'])
+        
+        # Check that Beatles come before Muse (alphabetical order)
+        assert positions['Beatles'] > 0 and positions['Muse'] > 0
+        assert positions['Beatles'] < positions['Muse']
+        
+        # Check that Beatles albums are sorted by year (1967, 1969, 1971)
+        assert positions['1967'] > 0 and positions['1969'] > 0 and positions['1971'] > 0
+        assert positions['1967'] < positions['1969'] < positions['1971']
+        
+        # Test oldest first sorting
+        response = authed_client.get('/releases/1?sort=oldest_first')
+        assert response.status_code == 200
+        # Should show oldest first (1967, 1969, 1971, 2009, 2012, 2015)
+        years = ['1967', '1969', '1971', '2009', '2012', '2015']
+        positions = _first_positions(response.data, years)
+        # Check that years appear in ascending order
+        assert [positions[year] for year in years] == sorted(positions.values())
+        
+        # Test artist Z-A sorting with secondary year sorting
+        response = authed_client.get('/releases/1?sort=artist_za')
+        assert response.status_code == 200
+        # Should show artists in reverse alphabetical order (Muse, Beatles)
+        # And within each artist, albums should be sorted by year (newest to oldest)
+        positions = _first_positions(response.data, ['Muse', 'Beatles', '2015', '2012', '2009'])
+        
+        # Check that Muse comes before Beatles (reverse alphabetical order)
+        assert positions['Muse'] > 0 and positions['Beatles'] > 0
+        assert positions['Muse'] < positions['Beatles']
+        
+        # Check that Muse albums are sorted by year (2015, 2012, 2009)
+        assert positions['2015'] > 0 and positions['2012'] > 0 and positions['2009'] > 0
+        assert positions['2015'] < positions['2012'] < positions['2009']
+        
+        # Test date added sorting
+        response = authed_client.get('/releases/1?sort=date_added')
+        assert response.status_code == 200
+        # Should show most recently added first (2022, 2021, 2020, 2019, 2018, 2017)
+        dates = ['2022-01-01', '2021-01-01', '2020-01-01', '2019-01-01', '2018-01-01', '2017-01-01']
+        positions = _first_positions(response.data, dates)
+        # Check that dates appear in descending order (newest added first)
+        assert [positions[date] for date in dates] == sorted(positions.values())
 
-    def test_releases_letter_selection_ui(self, flask_test_client):
+    def test_releases_letter_selection_ui(self, authed_client, patched_routes_client, mock_letter_release_data):
         """Test that the letter selection UI is present on releases page"""
-        with flask_test_client.session_transaction() as sess:
-            sess['oauth_token'] = 'test_token'
-            sess['oauth_secret'] = 'test_secret'
-            sess['consumer_key'] = 'test_key'
-            sess['consumer_secret'] = 'test_secret'
-
-        with patch('app.routes.DiscogsCollectionClient') as mock_client_class:
-            # Mock the client
-            mock_client = MagicMock()
-            mock_client_class.return_value = mock_client
-
-            # Mock release retrieval with artists starting with different letters
-            mock_release_data = {
-                0: {
-                    'id': 100,
-                    'title': 'Album One',
-                    'artist': 'Artist One',
-                    'year': 2020,
-                    'format': [{'name': 'Vinyl', 'qty': '1'}],
-                    'label': 'Label One',
-                    'url': 'https://www.discogs.com/release/100-Artist-One-Album-One'
-                },
-                1: {
-                    'id': 101,
-                    'title': 'Beatles Album',
-                    'artist': 'Beatles',
-                    'year': 2021,
-                    'format': [{'name': 'Vinyl', 'qty': '1'}],
-                    'label': 'Label Two',
-                    'url': 'https://www.discogs.com/release/101-Beatles-Album'
-                },
-                2: {
-                    'id': 102,
-                    'title': 'Muse Album',
-                    'artist': 'Muse',
-                    'year': 2022,
-                    'format': [{'name': 'Vinyl', 'qty': '1'}],
-                    'label': 'Label Three',
-                    'url': 'https://www.discogs.com/release/102-Muse-Album'
-                },
-                3: {
-                    'id': 103,
-                    'title': 'Numeric Band',
-                    'artist': '123 Band',
-                    'year': 2023,
-                    'format': [{'name': 'Vinyl', 'qty': '1'}],
-                    'label': 'Label Four',
-                    'url': 'https://www.discogs.com/release/103-123-Band'
-                }
-            }
+        patched_routes_client.get_collection_releases_by_folder.return_value = mock_letter_release_data
 
-            mock_client.get_collection_releases_by_folder.return_value = mock_release_data
-
-            response = flask_test_client.get('/releases/1')
-            assert response.status_code == 200
-
-            # Check that letter selection UI elements are present
-            data = response.data.decode('utf-8')
-            assert 'Select by Artist Starting Letter:' in data
-            assert 'letter-dropdown-container' in data
-            assert 'letter-dropdown-button' in data
-            assert 'letter-dropdown-menu' in data
-            assert 'letter-search' in data
-            assert 'letter-options' in data
-            assert 'clear-letter-selection' in data
-            assert 'select-by-letter' in data
-            assert 'deselect-by-letter' in data
+        response = authed_client.get('/releases/1')
+        assert response.status_code == 200
 
-            # Check that the dropdown button text is present
-            assert 'Select Letters' in data
+        # Check that the letter selection label and dropdown button text are present
+        assert _LETTER_UI_TEXT_RE.search(response.data) is not None
+        # Collect all element ids in one pass instead of scanning the page per element
+        assert _LETTER_UI_IDS <= set(_ELEMENT_ID_RE.findall(response.data))
@@ -4,69 +4,52 @@ Integration tests for the complete workflow.
 Tests the end-to-end functionality from authentication to CSV generation.
 """
 
-from unittest.mock import Mock, patch, MagicMock
-from services.discogs_api_client import DiscogsCollectionClient
-from services.discogs_collection_processor import DiscogsCollectionProcessor
+from collections import namedtuple
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+# Read-only folders and releases, built once at import
+_Folder = namedtuple("_Folder", "id name")
+_Release = namedtuple("_Release", "id title year")
+_MOCK_FOLDERS = (
+    _Folder(1, "Favorites"),
+    _Folder(2, "Vinyl Collection"),
+    _Folder(3, "Digital Music")
+)
+_MOCK_RELEASES = (
+    _Release(100, "Album One", 2020),
+    _Release(101, "Album Two", 2021),
+    _Release(102, "Album Three", 2022)
+)
 
 
 class TestCompleteWorkflow:
     """Test suite for complete workflow"""
 
-    def test_authentication_step(self):
+    def test_authentication_step(self, shared_client):
         """Test the authentication step of the workflow"""
-        client = DiscogsCollectionClient(consumer_key="test", consumer_secret="test", useragent="pyqrfactorydiscogs/1.0")
-        assert hasattr(client, 'authenticate'), "Client should have authenticate method"
+        assert hasattr(shared_client, 'authenticate'), "Client should have authenticate method"
 
-    def test_folder_retrieval_step(self):
+    def test_folder_retrieval_step(self, shared_client):
         """Test the folder retrieval step of the workflow"""
-        client = DiscogsCollectionClient(consumer_key="test", consumer_secret="test", useragent="pyqrfactorydiscogs/1.0")
-        
-        mock_folders = [
-            Mock(id=1, name="Favorites"),
-            Mock(id=2, name="Vinyl Collection"),
-            Mock(id=3, name="Digital Music")
-        ]
-        
-        with patch.object(client, 'get_collection_folders', return_value=mock_folders):
-            folders = client.get_collection_folders()
+        with patch.object(shared_client, 'get_collection_folders', return_value=_MOCK_FOLDERS):
+            folders = shared_client.get_collection_folders()
             assert len(folders) == 3, "Should retrieve 3 folders"
 
-    def test_release_retrieval_step(self):
+    def test_release_retrieval_step(self, shared_client):
         """Test the release retrieval step of the workflow"""
-        client = DiscogsCollectionClient(consumer_key="test", consumer_secret="test", useragent="pyqrfactorydiscogs/1.0")
-        
-        mock_releases = [
-            Mock(id=100, title="Album One", year=2020),
-            Mock(id=101, title="Album Two", year=2021),
-            Mock(id=102, title="Album Three", year=2022)
-        ]
-        
-        with patch.object(client, 'get_collection_releases_by_folder', return_value=mock_releases):
-            releases = client.get_collection_releases_by_folder(folder_id=1)
+        with patch.object(shared_client, 'get_collection_releases_by_folder', return_value=_MOCK_RELEASES):
+            releases = shared_client.get_collection_releases_by_folder(folder_id=1)
             assert len(releases) == 3, "Should retrieve 3 releases"
 
-    def test_csv_generation_step(self):
+    def test_csv_generation_step(self, processor, mock_release_data):
         """Test the CSV generation step of the workflow"""
-        processor = DiscogsCollectionProcessor()
-        release_data = [
-            {"id": 100, "title": "Album One", "year": 2020, "artist": "Artist One", "url": "https://example.com/1"},
-            {"id": 101, "title": "Album Two", "year": 2021, "artist": "Artist Two", "url": "https://example.com/2"}
-        ]
-        
         # Test the extract method
-        extracted_data = processor.extract_release_info(release_data)
+        extracted_data = processor.extract_release_info(mock_release_data)
         assert len(extracted_data) == 2, "Should extract 2 releases"
 
-    def test_complete_data_flow(self):
+    def test_complete_data_flow(self, shared_client, stub_processor):
         """Test the complete data flow from authentication to CSV generation"""
-        client = DiscogsCollectionClient(consumer_key="test", consumer_secret="test", useragent="pyqrfactorydiscogs/1.0")
-        processor = DiscogsCollectionProcessor()
-        
-        mock_folders = [
-            Mock(id=1, name="Favorites"),
-            Mock(id=2, name="Vinyl Collection")
-        ]
-        
         # Use a simpler mock structure that matches the expected format
         mock_releases = [
             {"id": 100, "title": "Album One", "year": 2020, "artist": "Artist One", "url": "https://example.com/1"},
@@ -74,14 +57,14 @@ class TestCompleteWorkflow:
             {"id": 102, "title": "Album Three", "year": 2022, "artist": "Artist Three", "url": "https://example.com/3"}
         ]
         
-        with patch.object(client, 'get_collection_folders', return_value=mock_folders), \
-             patch.object(client, 'get_collection_releases_by_folder', return_value=mock_releases):
+        with patch.object(shared_client, 'get_collection_folders', return_value=_MOCK_FOLDERS), \
+             patch.object(shared_client, 'get_collection_releases_by_folder', return_value=mock_releases):
             
-            folders = client.get_collection_folders()
-            releases = client.get_collection_releases_by_folder(1)
+            folders = shared_client.get_collection_folders()
+            releases = shared_client.get_collection_releases_by_folder(1)
             
-            # For this test, we'll use the mock_releases directly since we know it's a list
-            extracted_data = processor.extract_release_info(mock_releases)
+            # Only the wiring is tested here; extraction itself is covered by the processor unit tests
+            extracted_data = stub_processor.extract_release_info(releases)
             assert len(extracted_data) == 3, "Should process 3 releases"
 
     def test_release_sorting_functionality(self):
@@ -102,28 +85,20 @@ class TestCompleteWorkflow:
         
         assert set(selected_releases).issubset(set(all_releases)), "Selected releases should be subset of all"
 
-    def test_workflow_with_mock_authentication(self):
+    def test_workflow_with_mock_authentication(self, client, processor, monkeypatch):
         """Test complete workflow with mocked authentication"""
-        with patch('services.discogs_api_client.os.getenv') as mock_getenv, \
-             patch('services.discogs_api_client.discogs_client.Client') as mock_client_class:
-            
-            # Setup mock environment variables
-            mock_getenv.side_effect = lambda key, default: {
-                'DISCOGS_OAUTH_TOKEN': 'test_token',
-                'DISCOGS_OAUTH_TOKEN_SECRET': 'test_secret'
-            }.get(key, default)
-            
-            # Create client
-            client = DiscogsCollectionClient(
-                consumer_key="test_key",
-                consumer_secret="test_secret",
-                useragent="pyqrfactorydiscogs/1.0"
-            )
-            
+        # Setup environment variables; authenticate() reads them with the real os.getenv
+        monkeypatch.setenv('DISCOGS_OAUTH_TOKEN', 'test_token')
+        monkeypatch.setenv('DISCOGS_OAUTH_TOKEN_SECRET', 'test_secret')
+        
+        # Imported here rather than at collection; the real classes are only needed as mock specs
+        from discogs_client import Client, User
+        
+        with patch('discogs_client.Client') as mock_client_class:
             # Mock the client and identity
-            mock_client = MagicMock()
+            mock_client = Mock(spec=Client)
             mock_client_class.return_value = mock_client
-            mock_identity = Mock()
+            mock_identity = Mock(spec=User)
             mock_identity.username = "test_user"
             mock_client.identity.return_value = mock_identity
             
@@ -131,24 +106,19 @@ class TestCompleteWorkflow:
             client.authenticate()
             
             # Mock folder and release data
-            mock_folder = Mock()
-            mock_folder.id = 1
-            mock_folder.name = "Test Folder"
-            
-            mock_release = Mock()
-            mock_release.id = 100
-            mock_release.release.title = "Test Album"
-            mock_artist = Mock()
-            mock_artist.name = "Test Artist"
-            mock_release.release.artists = [mock_artist]
-            mock_release.release.year = 2023
-            mock_release.release.formats = [{'name': 'Vinyl', 'qty': '1'}]
-            mock_label = Mock()
-            mock_label.name = "Test Label"
-            mock_release.release.labels = [mock_label]
-            mock_release.release.url = "https://www.discogs.com/release/100-Test-Artist-Test-Album"
-            
-            mock_folder.releases = [mock_release]
+            mock_release = SimpleNamespace(
+                id=100,
+                date_added="2023-01-01",
+                release=SimpleNamespace(
+                    title="Test Album",
+                    artists=[SimpleNamespace(name="Test Artist")],
+                    year=2023,
+                    formats=[{'name': 'Vinyl', 'qty': '1'}],
+                    labels=[SimpleNamespace(name="Test Label")],
+                    url="https://www.discogs.com/release/100-Test-Artist-Test-Album"
+                )
+            )
+            mock_folder = SimpleNamespace(id=1, name="Test Folder", releases=[mock_release])
             mock_identity.collection_folders = [mock_folder]
             
             # Test complete flow
@@ -159,7 +129,6 @@ class TestCompleteWorkflow:
             assert len(releases) == 1
             
             # Test CSV processing
-            processor = DiscogsCollectionProcessor()
             # Extract the release data from the dict structure
             if isinstance(releases, dict):
                 release_data = list(releases.values())
@@ -0,0 +1,127 @@
+"""
+Pytest fixtures shared by the unit tests.
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import Mock, create_autospec, patch
+
+
+@pytest.fixture(autouse=True)
+def _discogs_env(monkeypatch):
+    """Fixture blanking the Discogs OAuth environment variables so a developer's .env cannot leak into unit tests"""
+    for name in ("DISCOGS_OAUTH_TOKEN", "DISCOGS_OAUTH_TOKEN_SECRET", "DISCOGS_OAUTH_VERIFIER"):
+        # Set rather than delete, so monkeypatch restores whatever authenticate() writes
+        monkeypatch.setenv(name, "")
+
+
+@pytest.fixture
+def client_with_tokens(discogs_client_cls, base_credentials):
+    """Fixture for a fresh DiscogsCollectionClient holding OAuth request tokens"""
+    return discogs_client_cls(
+        **base_credentials,
+        oauth_token="request_token",
+        oauth_token_secret="request_token_secret"
+    )
+
+
+def _make_collection_item(release_id, title, artist, year, fmt, label, date_added):
+    """Build a collection folder item shaped like a discogs_client CollectionItem from plain attribute objects"""
+    slug = f"{artist}-{title}".replace(' ', '-')
+    return SimpleNamespace(
+        id=release_id,
+        date_added=date_added,
+        release=SimpleNamespace(
+            title=title,
+            artists=[SimpleNamespace(name=artist)],
+            year=year,
+            formats=[{'name': fmt, 'qty': '1'}],
+            labels=[SimpleNamespace(name=label)],
+            url=f"https://www.discogs.com/release/{release_id}-{slug}"
+        )
+    )
+
+
+@pytest.fixture(scope="module")
+def sample_releases():
+    """Fixture providing collection folder items shaped like discogs_client CollectionItem objects (read-only)"""
+    return [
+        _make_collection_item(100, "Album One", "Artist One", 2020, "Vinyl", "Label One", "2023-01-01"),
+        _make_collection_item(101, "Album Two", "Artist Two", 2021, "CD", "Label Two", "2023-02-01")
+    ]
+
+
+@pytest.fixture(scope="module")
+def sample_release():
+    """Fixture providing a single release shaped like a discogs_client Release object (read-only)"""
+    return SimpleNamespace(
+        id=100,
+        title="Album One",
+        artists=[SimpleNamespace(name="Artist One")],
+        year=2020,
+        formats=[{'name': 'Vinyl', 'qty': '1'}],
+        labels=[SimpleNamespace(name="Label One")],
+        url="https://www.discogs.com/release/100-Artist-One-Album-One"
+    )
+
+
+@pytest.fixture
+def mock_api_client():
+    """Fixture for a Mock specced on discogs_client.Client, which is imported only when a test needs it"""
+    from discogs_client import Client
+    
+    return Mock(spec=Client)
+
+
+@pytest.fixture
+def mock_client_class(mock_api_client):
+    """Fixture patching discogs_client.Client for the duration of a test; it returns mock_api_client"""
+    with patch('discogs_client.Client', return_value=mock_api_client) as mock_client_class:
+        yield mock_client_class
+
+
+@pytest.fixture(scope="session")
+def mock_identity():
+    """Fixture providing the authenticated user identity; the client only reads its username (read-only)"""
+    return SimpleNamespace(username="test_user")
+
+
+@pytest.fixture
+def oauth_client_mock(mock_client_class, mock_identity):
+    """Fixture yielding the patched discogs_client.Client class mock and the client instance it returns"""
+    mock_client = mock_client_class.return_value
+    mock_client.get_authorize_url.return_value = ("request_token", "request_token_secret", "https://auth.url")
+    mock_client.get_access_token.return_value = ("access_token", "access_token_secret")
+    mock_client.identity.return_value = mock_identity
+    
+    return mock_client_class, mock_client
+
+
+@pytest.fixture
+def mock_user():
+    """Fixture for an autospecced discogs_client User; unknown attributes raise instead of creating child mocks"""
+    from discogs_client import User
+    
+    # Built per test: copies of one autospec would share their child mocks
+    return create_autospec(User, spec_set=True, instance=True)
+
+
+@pytest.fixture
+def mock_folder():
+    """Fixture for an autospecced discogs_client CollectionFolder with id 1"""
+    from discogs_client import CollectionFolder
+    
+    folder = create_autospec(CollectionFolder, spec_set=True, instance=True)
+    folder.id = 1
+    folder.name = "Test Folder"
+    
+    return folder
+
+
+@pytest.fixture(scope="session")
+def csv_template(tmp_path_factory):
+    """Fixture providing the path to a CSV template with artist, title, year and url placeholders, written once per session (read-only)"""
+    template_path = tmp_path_factory.mktemp("templates") / "template.csv"
+    template_path.write_text("artist,title,year,url\n{artist},{title},{year},{url}")
+    
+    return str(template_path)
@@ -4,22 +4,20 @@ Unit tests for DiscogsCollectionClient class.
 Tests the authentication, folder retrieval, and release retrieval functionality.
 """
 
+import pickle
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-from services.discogs_api_client import DiscogsCollectionClient
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock
+
+# Canonical release URLs are this prefix followed by the release id
+EXPECTED_URL_PREFIX = "https://www.discogs.com/release/"
 
 
 class TestDiscogsCollectionClient:
     """Test suite for DiscogsCollectionClient"""
 
-    def test_initialization(self):
+    def test_initialization(self, client):
         """Test client initialization with valid credentials"""
-        client = DiscogsCollectionClient(
-            consumer_key="test_key",
-            consumer_secret="test_secret",
-            useragent="pyqrfactorydiscogs/1.0"
-        )
-        
         assert client.consumer_key == "test_key"
         assert client.consumer_secret == "test_secret"
         assert client.useragent == "pyqrfactorydiscogs/1.0"
@@ -28,9 +26,9 @@ class TestDiscogsCollectionClient:
         assert client.client is None
         assert client.user is None
 
-    def test_initialization_with_tokens(self):
+    def test_initialization_with_tokens(self, discogs_client_cls):
         """Test client initialization with OAuth tokens"""
-        client = DiscogsCollectionClient(
+        client = discogs_client_cls(
             consumer_key="test_key",
             consumer_secret="test_secret",
             useragent="pyqrfactorydiscogs/1.0",
@@ -41,41 +39,38 @@ class TestDiscogsCollectionClient:
         assert client.oauth_token == "test_token"
         assert client.oauth_token_secret == "test_token_secret"
 
-    def test_initialization_invalid_credentials(self):
-        """Test client initialization with invalid credential types"""
-        with pytest.raises(ValueError):
-            DiscogsCollectionClient(123, "test_secret", "useragent")
-        
-        with pytest.raises(ValueError):
-            DiscogsCollectionClient("test_key", 456, "useragent")
-
-    @patch('services.discogs_api_client.os.getenv')
-    @patch('services.discogs_api_client.discogs_client.Client')
-    def test_authenticate_with_tokens(self, mock_client_class, mock_getenv):
-        """Test authentication when OAuth tokens are provided"""
-        # Setup mock environment variables
-        mock_getenv.side_effect = lambda key, default: {
-            'DISCOGS_OAUTH_TOKEN': 'env_token',
-            'DISCOGS_OAUTH_TOKEN_SECRET': 'env_token_secret'
-        }.get(key, default)
-        
-        client = DiscogsCollectionClient(
-            consumer_key="test_key",
-            consumer_secret="test_secret",
-            useragent="pyqrfactorydiscogs/1.0"
+    @pytest.mark.parametrize("ctor_args, method, method_args, message", [
+        ((123, "test_secret", "useragent"), None, (), "consumer_key and consumer_secret must be strings"),
+        (("test_key", 456, "useragent"), None, (), "consumer_key and consumer_secret must be strings"),
+        (
+            ("", "", "pyqrfactorydiscogs/1.0"),
+            "get_authorize_url_with_callback",
+            ("http://callback.url",),
+            "Consumer key and secret must be set"
+        ),
+        (
+            ("test_key", "test_secret", "pyqrfactorydiscogs/1.0"),
+            "complete_oauth",
+            ("verifier_code",),
+            "Request token and secret must be set before completing OAuth"
         )
+    ], ids=["invalid_key_type", "invalid_secret_type", "authorize_url_without_credentials", "complete_oauth_without_tokens"])
+    def test_validation(self, discogs_client_cls, ctor_args, method, method_args, message):
+        """Test that invalid credentials and missing tokens raise ValueError"""
+        with pytest.raises(ValueError) as exc_info:
+            client = discogs_client_cls(*ctor_args)
+            if method:
+                getattr(client, method)(*method_args)
+        assert message in str(exc_info.value)
+
+    def test_authentication_with_stored_tokens(self, oauth_client_mock, client, monkeypatch):
+        """Test that tokens stored in the environment are used directly, without an OAuth round trip"""
+        mock_client_class, mock_client = oauth_client_mock
+        monkeypatch.setenv("DISCOGS_OAUTH_TOKEN", "env_token")
+        monkeypatch.setenv("DISCOGS_OAUTH_TOKEN_SECRET", "env_token_secret")
         
-        # Mock the client and identity
-        mock_client = MagicMock()
-        mock_client_class.return_value = mock_client
-        mock_identity = Mock()
-        mock_identity.username = "test_user"
-        mock_client.identity.return_value = mock_identity
-        
-        # Call authenticate
         client.authenticate()
         
-        # Verify client was created with correct parameters
         mock_client_class.assert_called_once_with(
             consumer_key='test_key',
             consumer_secret='test_secret',
@@ -83,141 +78,114 @@ class TestDiscogsCollectionClient:
             token='env_token',
             secret='env_token_secret'
         )
+        mock_client.get_access_token.assert_not_called()
+        assert client.client == mock_client
+        assert client.user == mock_client.identity.return_value
+        mock_client.identity.assert_called_once()
+
+    @pytest.mark.parametrize("isatty, expected_verifier, input_called", [
+        pytest.param(True, "verifier_code", True, id="interactive", marks=pytest.mark.slow),
+        pytest.param(False, "env_verifier", False, id="non_interactive")
+    ])
+    def test_authentication_oauth_flow(self, oauth_client_mock, client, monkeypatch, isatty, expected_verifier, input_called):
+        """Test the OAuth flow, prompting for the verifier on a terminal and reading DISCOGS_OAUTH_VERIFIER otherwise"""
+        mock_client_class, mock_client = oauth_client_mock
+        monkeypatch.setenv("DISCOGS_OAUTH_VERIFIER", "env_verifier")
+        mock_stdin = Mock()
+        mock_stdin.isatty.return_value = isatty
+        monkeypatch.setattr('services.discogs_api_client.sys.stdin', mock_stdin)
+        mock_input = Mock(side_effect=["", "verifier_code"])
+        monkeypatch.setattr('builtins.input', mock_input)
         
-        assert client.user == mock_identity
+        client.authenticate()
+        
+        mock_client.get_authorize_url.assert_called_once()
+        mock_client.get_access_token.assert_called_once_with(expected_verifier)
+        assert mock_input.called == input_called
+        assert client.oauth_token == "access_token"
+        assert client.oauth_token_secret == "access_token_secret"
+        assert client.client == mock_client
+        assert client.user == mock_client.identity.return_value
+        mock_client.identity.assert_called_once()
 
-    @patch('services.discogs_api_client.os.getenv')
-    @patch('services.discogs_api_client.discogs_client.Client')
-    @patch('builtins.input')
-    def test_authenticate_interactive_flow(self, mock_input, mock_client_class, mock_getenv):
-        """Test authentication with interactive OAuth flow"""
-        # Setup mock environment variables to return empty strings
-        mock_getenv.return_value = ""
+    def test_complete_oauth(self, oauth_client_mock, client_with_tokens):
+        """Test exchanging the request tokens and verifier for access tokens"""
+        mock_client_class, mock_client = oauth_client_mock
+        
+        assert client_with_tokens.complete_oauth("verifier_code") == ("access_token", "access_token_secret")
         
-        client = DiscogsCollectionClient(
+        # The client is initialized with the request tokens before the exchange
+        mock_client_class.assert_called_once_with(
             consumer_key="test_key",
             consumer_secret="test_secret",
-            useragent="pyqrfactorydiscogs/1.0"
+            user_agent="pyqrfactorydiscogs/1.0",
+            token='request_token',
+            secret='request_token_secret'
         )
-        
+        mock_client.get_access_token.assert_called_once_with("verifier_code")
+        assert client_with_tokens.oauth_token == "access_token"
+        assert client_with_tokens.oauth_token_secret == "access_token_secret"
+        assert client_with_tokens.client == mock_client
+        assert client_with_tokens.user == mock_client.identity.return_value
+        mock_client.identity.assert_called_once()
+
+    def test_get_authorize_url_with_callback_success(self, mock_client_class, client):
+        """Test successful get_authorize_url_with_callback method"""
         # Mock the client
-        mock_client = MagicMock()
-        mock_client.get_authorize_url.return_value = ("request_token", "request_secret", "https://auth.url")
-        mock_client.get_access_token.return_value = ("access_token", "access_secret")
-        mock_client_class.return_value = mock_client
-        
-        # Mock user input
-        mock_input.side_effect = ["y", "verifier_code"]
-        
-        # Mock identity
-        mock_identity = Mock()
-        mock_identity.username = "test_user"
-        mock_client.identity.return_value = mock_identity
+        mock_client = mock_client_class.return_value
+        mock_client.get_authorize_url.return_value = (
+            "request_token",
+            "request_token_secret",
+            "https://www.discogs.com/oauth/authorize?oauth_token=request_token"
+        )
         
-        # Call authenticate
-        client.authenticate()
+        # Call method
+        callback_url = "http://localhost:5000/oauth-callback"
+        request_token, request_token_secret, authorize_url = client.get_authorize_url_with_callback(callback_url)
         
-        # Verify OAuth flow was initiated
-        mock_client.get_authorize_url.assert_called_once()
-        mock_client.get_access_token.assert_called_once_with("verifier_code")
+        # Verify results
+        assert request_token == "request_token"
+        assert request_token_secret == "request_token_secret"
+        assert authorize_url == "https://www.discogs.com/oauth/authorize?oauth_token=request_token"
+        assert client.oauth_token == "request_token"
+        assert client.oauth_token_secret == "request_token_secret"
         
-        assert client.oauth_token == "access_token"
-        assert client.oauth_token_secret == "access_secret"
-        assert client.user == mock_identity
-
-    def test_get_collection_folders_no_authentication(self):
-        """Test folder retrieval when not authenticated"""
-        client = DiscogsCollectionClient(
+        # Verify client was created with correct parameters
+        mock_client_class.assert_called_once_with(
             consumer_key="test_key",
             consumer_secret="test_secret",
-            useragent="pyqrfactorydiscogs/1.0"
+            user_agent="pyqrfactorydiscogs/1.0"
         )
         
+        # Verify get_authorize_url was called with callback
+        mock_client.get_authorize_url.assert_called_once_with(callback_url=callback_url)
+
+    def test_get_collection_folders_no_authentication(self, client):
+        """Test folder retrieval when not authenticated"""
         # Should return empty list when user is None
         folders = client.get_collection_folders()
         assert folders == []
 
-    def test_get_folder_name_by_id(self):
+    @pytest.mark.parametrize("folder_id, expected", [
+        (1, "Favorites"),
+        (2, "Vinyl Collection"),
+        (999, "Unknown Folder")
+    ])
+    def test_get_folder_name_by_id(self, client, mock_folders, folder_id, expected):
         """Test getting folder name by ID"""
-        client = DiscogsCollectionClient(
-            consumer_key="test_key",
-            consumer_secret="test_secret",
-            useragent="pyqrfactorydiscogs/1.0"
-        )
-        
-        # Mock the user and folder structure
-        mock_user = Mock()
-        mock_folder1 = Mock()
-        mock_folder1.id = 1
-        mock_folder1.name = "Favorites"
-        
-        mock_folder2 = Mock()
-        mock_folder2.id = 2
-        mock_folder2.name = "Vinyl Collection"
-        
-        mock_user.collection_folders = [mock_folder1, mock_folder2]
-        client.user = mock_user
-        
-        # Test getting existing folder name
-        folder_name = client.get_folder_name_by_id(1)
-        assert folder_name == "Favorites"
-        
-        # Test getting another existing folder name
-        folder_name = client.get_folder_name_by_id(2)
-        assert folder_name == "Vinyl Collection"
+        # The user and folders are only read as attributes
+        client.user = SimpleNamespace(collection_folders=mock_folders)
         
-        # Test getting non-existing folder name
-        folder_name = client.get_folder_name_by_id(999)
-        assert folder_name == "Unknown Folder"
-        
-        # Test with no authentication (no user)
-        client.user = None
-        folder_name = client.get_folder_name_by_id(1)
-        assert folder_name == "Unknown Folder"
+        assert client.get_folder_name_by_id(folder_id) == expected
+
+    def test_get_folder_name_by_id_unauthenticated(self, client):
+        """Test getting folder name by ID with no authentication (no user)"""
+        assert client.get_folder_name_by_id(1) == "Unknown Folder"
 
-    @patch.object(DiscogsCollectionClient, 'authenticate')
-    def test_get_collection_releases_by_folder(self, mock_authenticate):
+    def test_get_collection_releases_by_folder(self, client, mock_user, mock_folder, sample_releases):
         """Test release retrieval by folder"""
-        client = DiscogsCollectionClient(
-            consumer_key="test_key",
-            consumer_secret="test_secret",
-            useragent="pyqrfactorydiscogs/1.0"
-        )
-        
-        # Mock the user and folder structure
-        mock_user = Mock()
-        mock_folder = Mock()
-        mock_folder.id = 1
-        mock_folder.name = "Test Folder"
-        
-        # Mock releases
-        mock_release1 = Mock()
-        mock_release1.id = 100
-        mock_release1.release.title = "Album One"
-        mock_artist1 = Mock()
-        mock_artist1.name = "Artist One"
-        mock_release1.release.artists = [mock_artist1]
-        mock_release1.release.year = 2020
-        mock_release1.release.formats = [{'name': 'Vinyl', 'qty': '1'}]
-        mock_label1 = Mock()
-        mock_label1.name = "Label One"
-        mock_release1.release.labels = [mock_label1]
-        mock_release1.release.url = "https://www.discogs.com/release/100-Artist-One-Album-One"
-        
-        mock_release2 = Mock()
-        mock_release2.id = 101
-        mock_release2.release.title = "Album Two"
-        mock_artist2 = Mock()
-        mock_artist2.name = "Artist Two"
-        mock_release2.release.artists = [mock_artist2]
-        mock_release2.release.year = 2021
-        mock_release2.release.formats = [{'name': 'CD', 'qty': '1'}]
-        mock_label2 = Mock()
-        mock_label2.name = "Label Two"
-        mock_release2.release.labels = [mock_label2]
-        mock_release2.release.url = "https://www.discogs.com/release/101-Artist-Two-Album-Two"
-        
-        mock_folder.releases = [mock_release1, mock_release2]
+        # Wire the folder structure onto the autospecced user
+        mock_folder.releases = sample_releases
         mock_user.collection_folders = [mock_folder]
         
         client.user = mock_user
@@ -234,35 +202,13 @@ class TestDiscogsCollectionClient:
         assert result[1]['id'] == 101
         assert result[1]['title'] == "Album Two"
         assert result[1]['artist'] == "Artist Two"
+        assert result[1]['url'] == f"{EXPECTED_URL_PREFIX}101"
 
-    @patch('services.discogs_api_client.discogs_client.Client')
-    def test_get_release_by_releaseid(self, mock_client_class):
+    def test_get_release_by_releaseid(self, client, mock_api_client, sample_release):
         """Test retrieving a single release by ID"""
-        client = DiscogsCollectionClient(
-            consumer_key="test_key",
-            consumer_secret="test_secret",
-            useragent="pyqrfactorydiscogs/1.0"
-        )
-        
-        # Mock the client
-        mock_client = MagicMock()
-        mock_client_class.return_value = mock_client
-        
-        # Mock release
-        mock_rel = Mock()
-        mock_rel.id = 100
-        mock_rel.title = "Album One"
-        mock_artist = Mock()
-        mock_artist.name = "Artist One"
-        mock_rel.artists = [mock_artist]
-        mock_rel.year = 2020
-        mock_rel.formats = [{'name': 'Vinyl', 'qty': '1'}]
-        mock_label = Mock()
-        mock_label.name = "Label One"
-        mock_rel.labels = [mock_label]
-        mock_rel.url = "https://www.discogs.com/release/100-Artist-One-Album-One"
-        
-        mock_client.release.return_value = mock_rel
+        # The API client is assigned directly, so discogs_client.Client needs no patching
+        mock_client = mock_api_client
+        mock_client.release.return_value = sample_release
         client.client = mock_client
         
         # Call method
@@ -272,141 +218,61 @@ class TestDiscogsCollectionClient:
         assert result['id'] == 100
         assert result['title'] == "Album One"
         assert result['artist'] == "Artist One"
-        # The URL is processed by split('-', 1)[0] in the actual code
-        assert result['url'] == "https://www.discogs.com/release/100"
-
-    def test_get_authorize_url_with_callback_validation(self):
-        """Test validation in get_authorize_url_with_callback method"""
-        client = DiscogsCollectionClient(
-            consumer_key="",
-            consumer_secret="",
-            useragent="pyqrfactorydiscogs/1.0"
-        )
-        
-        # Should raise ValueError when credentials are not set
-        with pytest.raises(ValueError, match="Consumer key and secret must be set"):
-            client.get_authorize_url_with_callback("http://callback.url")
+        # The URL is the canonical release URL without the slug
+        assert result['url'] == f"{EXPECTED_URL_PREFIX}100"
 
-    @patch('services.discogs_api_client.discogs_client.Client')
-    def test_get_authorize_url_with_callback_success(self, mock_client_class):
-        """Test successful get_authorize_url_with_callback method"""
-        client = DiscogsCollectionClient(
-            consumer_key="test_key",
-            consumer_secret="test_secret",
-            useragent="pyqrfactorydiscogs/1.0"
-        )
+    @pytest.mark.slow
+    def test_get_release_by_releaseid_uses_cache(self, discogs_client_cls, base_credentials, mock_api_client, sample_release, tmp_path):
+        """Test that a cached release is returned without calling the API again"""
+        client = discogs_client_cls(**base_credentials, release_cache_path=str(tmp_path / "releases.db"))
         
         # Mock the client
-        mock_client = MagicMock()
-        mock_client.get_authorize_url.return_value = (
-            "request_token",
-            "request_token_secret",
-            "https://www.discogs.com/oauth/authorize?oauth_token=request_token"
-        )
-        mock_client_class.return_value = mock_client
+        mock_client = mock_api_client
+        mock_client.release.return_value = sample_release
+        client.client = mock_client
         
-        # Call method
-        callback_url = "http://localhost:5000/oauth-callback"
-        request_token, request_token_secret, authorize_url = client.get_authorize_url_with_callback(callback_url)
+        first = client.get_release_by_releaseid(100)
+        second = client.get_release_by_releaseid(100)
         
-        # Verify results
-        assert request_token == "request_token"
-        assert request_token_secret == "request_token_secret"
-        assert authorize_url == "https://www.discogs.com/oauth/authorize?oauth_token=request_token"
-        assert client.oauth_token == "request_token"
-        assert client.oauth_token_secret == "request_token_secret"
+        assert first == second
+        mock_client.release.assert_called_once_with(100)
         
-        # Verify client was created with correct parameters
-        mock_client_class.assert_called_once_with(
-            consumer_key="test_key",
-            consumer_secret="test_secret",
-            user_agent="pyqrfactorydiscogs/1.0"
-        )
+        # Expired entries are fetched again
+        client.max_age_days = 0
+        client.get_release_by_releaseid(100)
+        assert mock_client.release.call_count == 2
         
-        # Verify get_authorize_url was called with callback
-        mock_client.get_authorize_url.assert_called_once_with(callback_url=callback_url)
+        client.close()
 
-    def test_complete_oauth_validation(self):
-        """Test validation in complete_oauth method"""
-        client = DiscogsCollectionClient(
-            consumer_key="test_key",
-            consumer_secret="test_secret",
-            useragent="pyqrfactorydiscogs/1.0"
-        )
-        
-        # Should raise ValueError when request tokens are not set
-        with pytest.raises(ValueError, match="Request token and secret must be set before completing OAuth"):
-            client.complete_oauth("verifier_code")
-
-    @patch('services.discogs_api_client.discogs_client.Client')
-    def test_complete_oauth_success(self, mock_client_class):
-        """Test successful complete_oauth method"""
-        client = DiscogsCollectionClient(
-            consumer_key="test_key",
-            consumer_secret="test_secret",
-            useragent="pyqrfactorydiscogs/1.0",
-            oauth_token="request_token",
-            oauth_token_secret="request_token_secret"
-        )
-        
-        # Mock the client
-        mock_client = MagicMock()
-        mock_client.get_access_token.return_value = ("access_token", "access_token_secret")
-        mock_client_class.return_value = mock_client
-        
-        # Mock identity
-        mock_identity = Mock()
-        mock_identity.username = "test_user"
-        mock_client.identity.return_value = mock_identity
+    @pytest.mark.parametrize("failing_call, error", [
+        ("get", pickle.UnpicklingError("corrupt entry")),
+        ("sync", OSError("disk full"))
+    ], ids=["corrupt_read", "failed_write"])
+    def test_get_release_by_releaseid_ignores_cache_errors(self, client, mock_api_client, sample_release, failing_call, error):
+        """Test that release cache errors are logged and the API result is returned"""
+        mock_api_client.release.return_value = sample_release
+        client.client = mock_api_client
+        release_cache = MagicMock()
+        release_cache.get.return_value = None
+        getattr(release_cache, failing_call).side_effect = error
+        client._release_cache = release_cache
         
-        # Call method
-        access_token, access_token_secret = client.complete_oauth("verifier_code")
-        
-        # Verify results
-        assert access_token == "access_token"
-        assert access_token_secret == "access_token_secret"
-        assert client.oauth_token == "access_token"
-        assert client.oauth_token_secret == "access_token_secret"
-        assert client.user == mock_identity
-        
-        # Verify get_access_token was called with verifier
-        mock_client.get_access_token.assert_called_once_with("verifier_code")
+        result = client.get_release_by_releaseid(100)
         
-        # Verify identity was retrieved
-        mock_client.identity.assert_called_once()
+        assert result['id'] == 100
+        mock_api_client.release.assert_called_once_with(100)
 
-    @patch('services.discogs_api_client.discogs_client.Client')
-    def test_complete_oauth_client_initialization(self, mock_client_class):
-        """Test client initialization in complete_oauth when client is None"""
-        client = DiscogsCollectionClient(
-            consumer_key="test_key",
-            consumer_secret="test_secret",
-            useragent="pyqrfactorydiscogs/1.0",
-            oauth_token="request_token",
-            oauth_token_secret="request_token_secret"
-        )
-        client.client = None  # Simulate client not being initialized
-        
-        # Mock the client
-        mock_client = MagicMock()
-        mock_client.get_access_token.return_value = ("access_token", "access_token_secret")
-        mock_client_class.return_value = mock_client
-        
-        # Mock identity
-        mock_identity = Mock()
-        mock_identity.username = "test_user"
-        mock_client.identity.return_value = mock_identity
-        
-        # Call method
-        access_token, access_token_secret = client.complete_oauth("verifier_code")
-        
-        # Verify client was initialized
-        mock_client_class.assert_called_once_with(
-            consumer_key="test_key",
-            consumer_secret="test_secret",
-            user_agent="pyqrfactorydiscogs/1.0",
-            token='request_token',
-            secret='request_token_secret'
-        )
-        
-        assert client.client == mock_client
\ No newline at end of file
+    def test_get_release_by_releaseid_with_unreadable_cache(self, discogs_client_cls, base_credentials, mock_api_client, sample_release, tmp_path):
+        """Test that an unreadable cache file disables caching instead of failing every release"""
+        cache_path = tmp_path / "releases.db"
+        cache_path.write_bytes(b"not a dbm database")
+        client = discogs_client_cls(**base_credentials, release_cache_path=str(cache_path))
+        mock_api_client.release.return_value = sample_release
+        client.client = mock_api_client
+        
+        assert client.get_release_by_releaseid(100)['id'] == 100
+        assert client.get_release_by_releaseid(100)['id'] == 100
+        
+        # The cache is not reopened after the first failure
+        assert client._release_cache_disabled
+        assert mock_api_client.release.call_count == 2
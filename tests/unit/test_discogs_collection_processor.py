@@ -4,60 +4,61 @@ Unit tests for DiscogsCollectionProcessor class.
 Tests the data extraction and CSV generation functionality.
 """
 
+import io
 import pytest
-import tempfile
-import os
-from services.discogs_collection_processor import DiscogsCollectionProcessor
+
+# (artist, title, year, url) of each release in the mock_release_data fixture, in order
+EXPECTED_ROWS = [
+    ('Artist One', 'Album One', 2020, 'https://www.discogs.com/release/100-Artist-One-Album-One'),
+    ('Artist Two', 'Album Two', 2021, 'https://www.discogs.com/release/101-Artist-Two-Album-Two')
+]
+
+
+def _generate_csv_lines(processor, release_data, template_path):
+    """Generate a collection CSV in memory and return its lines"""
+    output = io.StringIO()
+    processor.generate_collection_csv(processor.extract_release_info(release_data), template_path, output)
+    return output.getvalue().splitlines()
 
 
 class TestDiscogsCollectionProcessor:
     """Test suite for DiscogsCollectionProcessor"""
 
-    def test_initialization(self):
+    def test_initialization(self, processor):
         """Test processor initialization"""
-        processor = DiscogsCollectionProcessor()
         assert processor is not None
 
-    def test_extract_release_info_valid_data(self, mock_release_data):
+    def test_extract_release_info_valid_data(self, processor, mock_release_data):
         """Test extraction of release information with valid data including year"""
-        processor = DiscogsCollectionProcessor()
-         
         result = processor.extract_release_info(mock_release_data)
         
-        assert len(result) == 2
-        assert result[0]['artist'] == 'Artist One'
-        assert result[0]['title'] == 'Album One'
-        assert result[0]['year'] == 2020
-        assert result[0]['url'] == 'https://www.discogs.com/release/100-Artist-One-Album-One'
-        assert result[1]['artist'] == 'Artist Two'
-        assert result[1]['title'] == 'Album Two'
-        assert result[1]['year'] == 2021
-        assert result[1]['url'] == 'https://www.discogs.com/release/101-Artist-Two-Album-Two'
-
-    def test_extract_release_info_missing_fields(self):
-        """Test extraction with missing required fields"""
-        processor = DiscogsCollectionProcessor()
-        
-        # Missing artist and id fields
-        invalid_data = [{
-            'title': 'Album One',
-            'url': 'https://example.com/album-one'
-        }]
-        
-        with pytest.raises(ValueError, match="Release entry missing required fields: \['artist', 'id'\]"):
-            processor.extract_release_info(invalid_data)
-
-    def test_extract_release_info_empty_list(self):
+        assert [(r['artist'], r['title'], r['year'], r['url']) for r in result] == EXPECTED_ROWS
+
+    @pytest.mark.parametrize("release_data, message", [
+        (
+            [{'title': 'Album One', 'url': 'https://example.com/album-one'}],
+            "Release entry missing required fields: ['artist', 'id']"
+        ),
+        (
+            [{'artist': 'Test Artist', 'title': 'Test Album', 'url': 'https://example.com/test'}],
+            "Release entry missing required fields: ['id']"
+        ),
+        ("not a list", "release_data must be a list")
+    ], ids=["missing_artist_and_id", "missing_id", "invalid_input_type"])
+    def test_extract_release_info_errors(self, processor, release_data, message):
+        """Test extraction with missing required fields or an invalid input type"""
+        # Plain substring checks; the messages need no regex matching
+        with pytest.raises(ValueError) as exc_info:
+            processor.extract_release_info(release_data)
+        assert message in str(exc_info.value)
+
+    def test_extract_release_info_empty_list(self, processor):
         """Test extraction with empty list"""
-        processor = DiscogsCollectionProcessor()
-        
         result = processor.extract_release_info([])
         assert result == []
 
-    def test_extract_release_info_without_year(self):
+    def test_extract_release_info_without_year(self, processor):
         """Test extraction with release data that doesn't include year field"""
-        processor = DiscogsCollectionProcessor()
-        
         # Release data without year field
         release_data_without_year = [
             {
@@ -79,92 +80,36 @@ class TestDiscogsCollectionProcessor:
         # Year should not be included if not present in source data
         assert 'year' not in result[0]
 
-    def test_extract_release_info_invalid_input_type(self):
-        """Test extraction with invalid input type"""
-        processor = DiscogsCollectionProcessor()
-        
-        with pytest.raises(ValueError, match="release_data must be a list"):
-            processor.extract_release_info("not a list")
-
-    def test_generate_collection_csv_valid_data(self, mock_release_data):
+    def test_generate_collection_csv_valid_data(self, processor, mock_release_data, csv_template):
         """Test CSV generation with valid data including year"""
-        processor = DiscogsCollectionProcessor()
-         
-        # Create a temporary template file with year placeholder
-        template_content = """artist,title,year,url
-{artist},{title},{year},{url}"""
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as template_file:
-            template_file.write(template_content)
-            template_path = template_file.name
-        
-        try:
-            # Create output path
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as output_file:
-                output_path = output_file.name
-             
-            # Extract release info first
-            release_info = processor.extract_release_info(mock_release_data)
-             
-            # Generate CSV
-            processor.generate_collection_csv(release_info, template_path, output_path)
-             
-            # Verify output file was created and contains expected content
-            assert os.path.exists(output_path)
-            
-            with open(output_path, 'r') as f:
-                content = f.read()
-                lines = content.strip().split('\n')
-                 
-                # Should have header + 2 data lines
-                assert len(lines) == 3
-                assert lines[0] == 'artist,title,year,url'
-                assert 'Artist One,Album One,2020,https://www.discogs.com/release/100-Artist-One-Album-One' in lines[1]
-                assert 'Artist Two,Album Two,2021,https://www.discogs.com/release/101-Artist-Two-Album-Two' in lines[2]
+        lines = _generate_csv_lines(processor, mock_release_data, csv_template)
          
-        finally:
-            # Clean up temporary files
-            if os.path.exists(template_path):
-                os.unlink(template_path)
-            if os.path.exists(output_path):
-                os.unlink(output_path)
-
-    def test_generate_collection_csv_missing_placeholders(self):
+        # Should have header + 2 data lines
+        assert lines[0] == 'artist,title,year,url'
+        assert lines[1:] == [','.join(map(str, row)) for row in EXPECTED_ROWS]
+
+    def test_generate_collection_csv_missing_placeholders(self, processor, tmp_path):
         """Test CSV generation with template missing required placeholders"""
-        processor = DiscogsCollectionProcessor()
-        
         # Create a template without required placeholders
-        template_content = """artist,title,url
-{artist},{title}"""  # Missing {url}
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as template_file:
-            template_file.write(template_content)
-            template_path = template_file.name
+        template_path = tmp_path / "template.csv"
+        template_path.write_text("""artist,title,url
+{artist},{title}""")  # Missing {url}
+        # The template is validated before anything is written, so this file is never created
+        output_path = tmp_path / "never_written.csv"
         
-        try:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as output_file:
-                output_path = output_file.name
-            
-            release_info = [{
-                'artist': 'Test Artist',
-                'title': 'Test Album',
-                'url': 'https://example.com/test'
-            }]
-            
-            with pytest.raises(ValueError, match="Template format line must contain {url} placeholder"):
-                processor.generate_collection_csv(release_info, template_path, output_path)
+        release_info = [{
+            'artist': 'Test Artist',
+            'title': 'Test Album',
+            'url': 'https://example.com/test'
+        }]
         
-        finally:
-            # Clean up
-            if os.path.exists(template_path):
-                os.unlink(template_path)
-            if os.path.exists(output_path):
-                os.unlink(output_path)
-
-    def test_generate_collection_csv_nonexistent_template(self):
+        with pytest.raises(ValueError) as exc_info:
+            processor.generate_collection_csv(release_info, str(template_path), str(output_path))
+        assert "Template format line must contain {url} placeholder" in str(exc_info.value)
+        assert not output_path.exists()
+
+    def test_generate_collection_csv_nonexistent_template(self, processor):
         """Test CSV generation with nonexistent template file"""
-        processor = DiscogsCollectionProcessor()
-        
         release_info = [{
             'artist': 'Test Artist',
             'title': 'Test Album',
@@ -174,76 +119,53 @@ class TestDiscogsCollectionProcessor:
         with pytest.raises(FileNotFoundError):
             processor.generate_collection_csv(release_info, 'nonexistent_template.csv', 'output.csv')
 
-    def test_generate_collection_csv_invalid_data_type(self):
+    def test_generate_collection_csv_invalid_data_type(self, processor):
         """Test CSV generation with invalid data type"""
-        processor = DiscogsCollectionProcessor()
-        
-        with pytest.raises(ValueError, match="release_data must be a list"):
+        with pytest.raises(ValueError) as exc_info:
             processor.generate_collection_csv("not a list", 'template.csv', 'output.csv')
+        assert "release_data must be a list" in str(exc_info.value)
 
-    def test_extract_release_info_missing_id_field(self):
-        """Test extraction with missing required id field"""
-        processor = DiscogsCollectionProcessor()
-        
-        # Missing id field
-        invalid_data = [{
-            'artist': 'Test Artist',
-            'title': 'Test Album',
-            'url': 'https://example.com/test'
-        }]
-        
-        with pytest.raises(ValueError, match="Release entry missing required fields: \['id'\]"):
-            processor.extract_release_info(invalid_data)
-
-    def test_extract_release_info_includes_id(self, mock_release_data):
+    def test_extract_release_info_includes_id(self, processor, mock_release_data):
         """Test that extracted release info includes id field"""
-        processor = DiscogsCollectionProcessor()
-        
         result = processor.extract_release_info(mock_release_data)
         
         assert len(result) == 2
         assert result[0]['id'] == 100
         assert result[1]['id'] == 101
 
-    def test_generate_collection_csv_with_filename_placeholder(self, mock_release_data):
+    def test_generate_collection_csv_with_filename_placeholder(self, processor, mock_release_data, tmp_path):
         """Test CSV generation with {filename} placeholder"""
-        processor = DiscogsCollectionProcessor()
-        
         # Create a template with filename placeholder
-        template_content = """artist,title,year,url,filename
-{artist},{title},{year},{url},{filename}"""
+        template_path = tmp_path / "template.csv"
+        template_path.write_text("""artist,title,year,url,filename
+{artist},{title},{year},{url},{filename}""")
+          
+        lines = _generate_csv_lines(processor, mock_release_data, str(template_path))
+          
+        # Should have header + 2 data lines, each ending in the release id
+        assert lines[0] == 'artist,title,year,url,filename'
+        assert lines[1:] == [f"{','.join(map(str, row))},{release_id}" for row, release_id in zip(EXPECTED_ROWS, (100, 101))]
+
+    def test_load_template_is_cached(self, processor, tmp_path):
+        """Test that a template is only read from disk once per processor"""
+        template_path = tmp_path / "template.csv"
+        template_path.write_text("artist,title,url\n{artist},{title},{url}")
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as template_file:
-            template_file.write(template_content)
-            template_path = template_file.name
+        header, format_line = processor.load_template(str(template_path))
+        assert header == ['artist', 'title', 'url']
+        assert format_line == ['{artist}', '{title}', '{url}']
         
-        try:
-            # Create output path
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as output_file:
-                output_path = output_file.name
-              
-            # Extract release info first
-            release_info = processor.extract_release_info(mock_release_data)
-              
-            # Generate CSV
-            processor.generate_collection_csv(release_info, template_path, output_path)
-              
-            # Verify output file was created and contains expected content
-            assert os.path.exists(output_path)
-              
-            with open(output_path, 'r') as f:
-                content = f.read()
-                lines = content.strip().split('\n')
-                  
-                # Should have header + 2 data lines
-                assert len(lines) == 3
-                assert lines[0] == 'artist,title,year,url,filename'
-                assert 'Artist One,Album One,2020,https://www.discogs.com/release/100-Artist-One-Album-One,100' in lines[1]
-                assert 'Artist Two,Album Two,2021,https://www.discogs.com/release/101-Artist-Two-Album-Two,101' in lines[2]
-          
-        finally:
-            # Clean up temporary files
-            if os.path.exists(template_path):
-                os.unlink(template_path)
-            if os.path.exists(output_path):
-                os.unlink(output_path)
\ No newline at end of file
+        # The cached template is used even after the file is gone
+        template_path.unlink()
+        processor.generate_collection_csv([], str(template_path), str(tmp_path / "output.csv"))
+        assert (tmp_path / "output.csv").read_text().splitlines() == ['artist,title,url']
+
+    def test_generate_collection_csv_accepts_path_object(self, processor, mock_release_data, csv_template, tmp_path):
+        """Test CSV generation with a pathlib.Path output path"""
+        output_path = tmp_path / "out.csv"
+        
+        processor.generate_collection_csv(processor.extract_release_info(mock_release_data), csv_template, output_path)
+        
+        lines = output_path.read_text().splitlines()
+        assert lines[0] == 'artist,title,year,url'
+        assert lines[1:] == [','.join(map(str, row)) for row in EXPECTED_ROWS]